@@ -1,11 +1,15 @@
 # uvicorn main:app --reload --port 8000
 import os
+from threading import Thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from routers import teams, patterns, setpieces, network, simulation, video
 from services.core.data import raw, matches
 from services.vaep.model import vaep_models
+from services.analyzers.pattern import pat_warm
+from services.analyzers.network import net_warm
+from services.dtw.matrix import pool_warm
 
 app = FastAPI(
     title="Matchday Scout API",
@@ -13,6 +17,13 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# 시작 시 공유 프로세스 풀 워커를 띄우고 DTW 커널을 미리 컴파일 (0이면 끔)
+POOL_WARM = os.getenv("POOL_WARM", "1") == "1"
+# 시작 시 전 팀 패턴 결과 캐시를 백그라운드로 미리 계산 (0이면 끔)
+PATTERN_WARM = os.getenv("PATTERN_WARM", "1") == "1"
+# 시작 시 전 팀 네트워크 결과물을 프로세스 풀에서 미리 계산 (0이면 끔, 진행 상황은 /api/network/warmup)
+NETWORK_WARM = os.getenv("NETWORK_WARM", "1") == "1"
+
 # CORS 설정
 CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",")
 
@@ -50,3 +61,10 @@ def ready_box():
         vaep_models()
     except Exception:
         pass
+    if POOL_WARM:
+        Thread(target=pool_warm, daemon=True).start()
+    # 계산 중인 팀에 들어온 요청은 같은 계산 결과를 기다림
+    if PATTERN_WARM:
+        Thread(target=pat_warm, daemon=True).start()
+    if NETWORK_WARM:
+        Thread(target=net_warm, daemon=True).start()
@@ -1,12 +1,18 @@
 # 네트워크 분석 API 라우터
 from fastapi import APIRouter, HTTPException
 
-from services.core.data import team_events, data_stamp
-from services.analyzers.network import net_box, NetworkAnalyzer
+from services.core.data import data_stamp
+from services.analyzers.network import NET_WARM, net_art, net_box, net_timeline
 
 router = APIRouter()
 
 
+# 시작 시 네트워크 결과물 워밍업 진행 상황 (/{team_id}보다 먼저 등록)
+@router.get("/warmup")
+def warmup():
+    return dict(NET_WARM)
+
+
 # 팀 패스 네트워크 분석 및 허브 탐지
 @router.get("/{team_id}")
 def network(team_id: int, n_games: int = 5, n_hubs: int = 2):
@@ -46,12 +52,10 @@ def graph(team_id: int, n_games: int = 5):
 @router.get("/{team_id}/hubs/{player_id}")
 def hub_detail(team_id: int, player_id: int, n_games: int = 5):
     try:
-        events = team_events(team_id, n_games)
-        if len(events) == 0:
+        mark = data_stamp()
+        analyzer = net_art(team_id, n_games, mark)
+        if analyzer is None:
             raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
-        
-        analyzer = NetworkAnalyzer(events)
-        analyzer.net_graph()
         cent = analyzer.cent()
         
         if player_id not in cent:
@@ -70,16 +74,31 @@ def hub_detail(team_id: int, player_id: int, n_games: int = 5):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# 경기별 / 최근 window 경기 구간별 허브 점수 추이
+@router.get("/{team_id}/timeline")
+def timeline(team_id: int, n_games: int = 38, window: int = 5):
+    try:
+        if window < 1:
+            raise HTTPException(status_code=400, detail="window는 1 이상이어야 합니다")
+        mark = data_stamp()
+        result = net_timeline(team_id, n_games, window, mark)
+        if not result:
+            raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
+        return {'team_id': team_id, 'n_games_analyzed': len(result['games']), **result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 # 모든 선수의 중심성 지표
 @router.get("/{team_id}/centrality")
 def cent_data(team_id: int, n_games: int = 5):
     try:
-        events = team_events(team_id, n_games)
-        if len(events) == 0:
+        mark = data_stamp()
+        analyzer = net_art(team_id, n_games, mark)
+        if analyzer is None:
             raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
-        
-        analyzer = NetworkAnalyzer(events)
-        analyzer.net_graph()
         cent = analyzer.cent()
         
         players = [{'player_id': int(pid) if not isinstance(pid, str) else pid, **stats}
@@ -91,3 +110,21 @@ def cent_data(team_id: int, n_games: int = 5):
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+# 압박 타겟 순위 (모든 선수의 제거 영향을 한 번에 계산)
+@router.get("/{team_id}/targets")
+def targets(team_id: int, n_games: int = 5, n_top: int = 10):
+    try:
+        if n_top < 1:
+            raise HTTPException(status_code=400, detail="n_top은 1 이상이어야 합니다")
+        mark = data_stamp()
+        analyzer = net_art(team_id, n_games, mark)
+        result = analyzer.target_list(n_top) if analyzer is not None else []
+        if not result:
+            raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
+        return {'team_id': team_id, 'n_games_analyzed': n_games, 'targets': result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -1,10 +1,14 @@
 # 패턴 분석 API 라우터
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 from typing import Optional
+import json
 import math
 
-from services.core.data import match_events, data_stamp
-from services.analyzers.pattern import team_pat, PhaseAnalyzer
+from services.core.data import recent_games, data_stamp
+from services.core.phase import phase_store
+from services.analyzers.pattern import SIMILAR_POOL_MAX, pat_box, similar_phases, zone_tag
+from services.analyzers.league import league_ready, league_start
 from services.analyzers.team import note_box
 from services.vaep.model import sum_box
 
@@ -26,64 +30,125 @@ def txt(value, default=''):
 router = APIRouter()
 
 
+# 리그 전체 팀 × 공유 프로토타입 패턴 비교 행렬 (/{team_id}보다 먼저 등록)
+@router.get("/league")
+def league(n_games: int = 5, n_protos: int = 20):
+    try:
+        if not 2 <= n_protos <= 100:
+            raise HTTPException(status_code=400, detail="n_protos는 2~100 사이여야 합니다")
+        mark = data_stamp()
+        result = league_ready(n_games, n_protos, mark)
+        if result is None:
+            # 캐시에 없으면 요청 안에서 계산하지 않고 배치를 시작한 뒤 202 반환
+            league_start(n_games, n_protos, mark)
+            return JSONResponse(
+                status_code=202, headers={"Retry-After": "30"},
+                content={"status": "pending", "n_games": n_games, "n_protos": n_protos,
+                         "detail": "리그 패턴을 계산 중입니다. 잠시 후 다시 요청하세요"},
+            )
+        if not result:
+            raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
+        return result
+    except HTTPException: raise
+    except Exception as e: raise HTTPException(status_code=500, detail=str(e))
+
+
+# 리그 전체에서 유사한 Phase 검색 (임베딩 kNN + 상위 후보 DTW 재정렬)
+@router.get("/similar/{phase_id}")
+def similar(
+    phase_id: int, k: int = 10, rerank: bool = True,
+    pool: int = Query(50, ge=1, le=SIMILAR_POOL_MAX), other_teams: bool = False
+):
+    try:
+        if not 1 <= k <= 100:
+            raise HTTPException(status_code=400, detail="k는 1~100 사이여야 합니다")
+        result = similar_phases(phase_id, k, rerank, pool, other_teams)
+        if result is None:
+            raise HTTPException(status_code=404, detail="Phase를 찾을 수 없습니다")
+        return result
+    except HTTPException: raise
+    except Exception as e: raise HTTPException(status_code=500, detail=str(e))
+
+
 # 팀 공격 패턴 분석
 @router.get("/{team_id}")
-def patterns(team_id: int, n_games: int = 5, n_patterns: int = 3):
+def patterns(
+    team_id: int, n_games: int = 5, n_patterns: int = 3, cluster_mode: str = "exact",
+    cutoff: Optional[float] = Query(None, gt=0)
+):
     try:
-        events = match_events(team_id, n_games, include_opponent=True, normalize_mode="team")
-        if len(events) == 0:
+        if cluster_mode not in ("exact", "landmark", "incremental"):
+            raise HTTPException(status_code=400, detail="cluster_mode는 exact, landmark 또는 incremental 입니다")
+        mark = data_stamp()
+        # cutoff: 이 거리를 넘는 DTW 쌍은 하한으로 가지치기 (패턴 수는 그대로, 가지치기 통계는 dtw_stats)
+        result = pat_box(team_id, n_games, n_patterns, mark, cluster_mode, cutoff=cutoff)
+        if not result:
             raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
-        
-        result = team_pat(events, team_id, n_patterns)
-        return {'team_id': team_id, 'n_games_analyzed': n_games, 'total_events': len(events), 'patterns': result}
+        return {'team_id': team_id, 'n_games_analyzed': n_games, **result}
     except HTTPException: raise
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
 
-# 팀의 Phase 분할 결과
+def phase_row(row) -> dict:
+    return {
+        'phase_id': int(row.phase_id), 'game_id': int(row.game_id), 'length': int(row.length),
+        'duration': round(float(row.duration), 1), 'has_shot': bool(row.shot_count > 0),
+        'passes': int(row.pass_count),
+        'start_zone': zone_tag(row.start_x, row.start_y),
+        'event_sequence': row.event_sequence[:100]
+    }
+
+
+def phase_lines(page):
+    # 200 헤더가 나간 뒤의 오류는 잘린 스트림 대신 마지막 error 줄로 전달
+    try:
+        for row in page.itertuples(index=False):
+            yield json.dumps(phase_row(row), ensure_ascii=False) + "\n"
+    except Exception as e:
+        yield json.dumps({'error': str(e)}, ensure_ascii=False) + "\n"
+
+
+# 팀의 Phase 분할 결과 (리그 Phase 저장소, phase_id 커서 페이지네이션 / NDJSON 스트리밍)
 @router.get("/{team_id}/phases")
-def phases(team_id: int, n_games: int = 5):
+def phases(team_id: int, n_games: int = 5, cursor: Optional[int] = None, limit: Optional[int] = None, stream: bool = False):
     try:
-        events = match_events(team_id, n_games, include_opponent=True)
-        if len(events) == 0:
+        games = recent_games(team_id, n_games)
+        if len(games) == 0:
             raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
+        if limit is not None and limit < 1:
+            raise HTTPException(status_code=400, detail="limit은 1 이상이어야 합니다")
         
-        analyzer = PhaseAnalyzer(events)
-        phase_list = analyzer.phase_list()
-        team_phases = [p for p in phase_list if int(p.iloc[0].get('team_id', -1)) == int(team_id)]
+        team_phases = phase_store().team_table(team_id, games)
+        # phase_id는 저장소 순서대로 증가하므로 커서 이후 위치를 이진 탐색
+        start = 0 if cursor is None else int(team_phases['phase_id'].searchsorted(cursor, side='right'))
         
-        summaries = []
-        for i, phase in enumerate(team_phases[:20]):
-            features = analyzer.phase_stats(phase)
-            summaries.append({
-                'phase_id': i, 'length': features['length'],
-                'duration': round(features['duration'], 1), 'has_shot': features['shot_count'] > 0,
-                'passes': features['pass_count'],
-                'start_zone': analyzer.zone_tag(features['start_x'], features['start_y']),
-                'event_sequence': features['event_sequence'][:100]
-            })
+        if stream:
+            # 스트리밍은 limit이 없으면 커서 이후 전체를 한 줄에 한 Phase씩 전송
+            page = team_phases.iloc[start:] if limit is None else team_phases.iloc[start:start + limit]
+            return StreamingResponse(phase_lines(page), media_type="application/x-ndjson")
+        
+        page = team_phases.iloc[start:start + (20 if limit is None else limit)]
+        summaries = [phase_row(row) for row in page.itertuples(index=False)]
+        more = start + len(page) < len(team_phases)
         
-        return {'team_id': team_id, 'n_games_analyzed': n_games, 'total_phases': len(team_phases), 'phases': summaries}
+        return {
+            'team_id': team_id, 'n_games_analyzed': n_games, 'total_phases': len(team_phases), 'phases': summaries,
+            'next_cursor': summaries[-1]['phase_id'] if more and summaries else None
+        }
     except HTTPException: raise
     except Exception as e: raise HTTPException(status_code=500, detail=str(e))
 
 
-# 특정 Phase 리플레이 데이터
+# 특정 Phase 리플레이 데이터 (phase_id로 O(1) 조회)
 @router.get("/{team_id}/phases/{phase_id}/replay")
-def phase_data(team_id: int, phase_id: int, n_games: int = 5):
+def phase_data(team_id: int, phase_id: int):
     try:
-        events = match_events(team_id, n_games, include_opponent=True)
-        if len(events) == 0:
-            raise HTTPException(status_code=404, detail="이벤트 데이터가 없습니다")
-        
-        analyzer = PhaseAnalyzer(events)
-        phase_list = analyzer.phase_list()
-        team_phases = [p for p in phase_list if int(p.iloc[0].get('team_id', -1)) == int(team_id)]
-        
-        if phase_id >= len(team_phases):
+        store = phase_store()
+        row = store.item(phase_id)
+        if row is None or int(row['team_id']) != int(team_id):
             raise HTTPException(status_code=404, detail="Phase를 찾을 수 없습니다")
         
-        phase = team_phases[phase_id]
+        phase = store.frame(phase_id)
         start_time = phase['time_seconds'].min()
         replay_data = {'phase_id': phase_id, 'events': []}
         
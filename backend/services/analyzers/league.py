@@ -0,0 +1,233 @@
+# 리그 공격 패턴 비교 - 공유 프로토타입 기준 팀 × 프로토타입 빈도/전환율 행렬 (배치 작업)
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from threading import Thread
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from ..core.cache import FlightCache
+from ..core.data import recent_games, teams
+from ..core.phase import PhaseStore, phase_store
+from ..core.pool import POOL_WORKERS, process_pool
+from ..core.spec import Analyzer
+from ..dtw.matrix import proto_near
+from .pattern import PatternMiner, zone_tag
+
+LEAGUE_PROTOS = 20
+LEAGUE_LANDMARKS = 400
+# 결과 형식이 바뀌면 올려서 이전 배치 파일을 무시
+LEAGUE_FORMAT = 2
+# 배치 결과 저장 디렉터리 (빈 문자열이면 메모리 캐시만 사용)
+LEAGUE_DIR = os.getenv("LEAGUE_CACHE_DIR", str(Path(__file__).resolve().parents[2] / ".cache" / "league"))
+
+
+def _team_task(seqs: List[np.ndarray], protos: List[np.ndarray], mode: str, band: Optional[int]) -> np.ndarray:
+    nearest, _ = proto_near(seqs, protos, mode, band)
+    return nearest
+
+
+class LeagueAnalyzer(Analyzer):
+    """Team x prototype attacking-pattern matrix for the whole league.
+
+    Prototypes are the cluster medoids of ``landmarks`` evenly spaced phases
+    drawn from every team's last ``n_games``; each team's phases are then
+    assigned to their nearest prototype, one team per worker process. Phases
+    come from the action-only store, segmented like ``/api/patterns/{team_id}``.
+    """
+
+    def __init__(
+        self,
+        n_games: int = 5,
+        n_protos: int = LEAGUE_PROTOS,
+        landmarks: int = LEAGUE_LANDMARKS,
+        workers: Optional[int] = None,
+        dtw_mode: str = "fast",
+        band: Optional[int] = None,
+        store: Optional[PhaseStore] = None,
+    ):
+        self.n_games = n_games
+        self.n_protos = n_protos
+        self.landmarks = landmarks
+        self.workers = POOL_WORKERS if workers is None else int(workers)
+        self.dtw_mode = dtw_mode
+        self.band = band
+        self.store = phase_store(actions=True) if store is None else store
+
+    def team_rows(self) -> Dict[int, np.ndarray]:
+        # store table positions of each team's phases in its recent games
+        table = self.store.table
+        rows = {}
+        for team_id in sorted(int(team["team_id"]) for team in teams()):
+            picked = self.store.team_table(team_id, recent_games(team_id, self.n_games))
+            rows[team_id] = table.index.get_indexer(picked.index)
+        return rows
+
+    def miner(self, pos: np.ndarray) -> PatternMiner:
+        return PatternMiner(self.store.index.take(pos), dtw_mode=self.dtw_mode, band=self.band, cluster_mode="exact")
+
+    def home_ids(self, protos: np.ndarray) -> List[Optional[int]]:
+        """Default-store ``phase_id`` of each prototype, None if there is none.
+
+        Replay and similar-phase search look ids up in ``phase_store()``,
+        which is segmented on every raw event, so each prototype maps to the
+        default-store phase of the same team holding most of its actions, and
+        to None when that phase holds less than half of them.
+        """
+        home = phase_store()
+        if home is self.store:
+            return [int(self.store.table["phase_id"].iloc[pos]) for pos in protos]
+
+        def codes(events: pd.DataFrame) -> np.ndarray:
+            game = pd.to_numeric(events["game_id"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+            action = pd.to_numeric(events["action_id"], errors="coerce").fillna(-1).to_numpy(dtype=np.int64)
+            return game * 10_000_000 + action
+
+        lookup = pd.Index(codes(home.index.events))
+        first = ~lookup.duplicated()
+        lookup, at = lookup[first], np.flatnonzero(first)
+        home_team = home.table["team_id"].to_numpy()
+        home_id = home.table["phase_id"].to_numpy()
+        events = self.store.index.events
+        ids = []
+        for pos in protos:
+            start, stop = self.store.index.starts[pos], self.store.index.stops[pos]
+            hit = lookup.get_indexer(codes(events.iloc[start:stop]))
+            phase = home.index.phase_id[at[hit[hit >= 0]]]
+            phase = phase[phase >= 0]
+            phase = phase[home_team[phase] == self.store.table["team_id"].iloc[pos]]
+            count = np.bincount(phase) if len(phase) else np.zeros(1, dtype=np.int64)
+            best = int(count.argmax())
+            ids.append(int(home_id[best]) if count[best] * 2 >= stop - start else None)
+        return ids
+
+    def proto_list(self, pos: np.ndarray) -> np.ndarray:
+        # store positions of the prototype phases
+        marks = pos[np.unique(np.linspace(0, len(pos) - 1, min(self.landmarks, len(pos))).round().astype(int))]
+        miner = self.miner(marks)
+        labels = miner.label_list(min(self.n_protos, len(marks)))
+        medoids = miner.medoid_list(labels)
+        return marks[np.array(sorted(medoids.values()), dtype=np.int64)]
+
+    def data(self) -> Dict:
+        rows = self.team_rows()
+        league = np.sort(np.concatenate(list(rows.values()))) if rows else np.zeros(0, dtype=np.int64)
+        if len(league) < 2:
+            return {}
+        protos = self.proto_list(league)
+        proto_seqs = self.miner(protos).seq_list()
+
+        team_ids = [team_id for team_id in rows if len(rows[team_id])]
+        tasks = [(self.miner(rows[team_id]).seq_list(), proto_seqs, self.dtw_mode, self.band) for team_id in team_ids]
+        if self.workers <= 1 or len(tasks) <= 1:
+            nearest = [_team_task(*task) for task in tasks]
+        else:
+            pool = process_pool(self.workers)
+            nearest = [future.result() for future in [pool.submit(_team_task, *task) for task in tasks]]
+
+        table = self.store.table
+        shots = table["shot_count"].to_numpy()
+        lengths = table["length"].to_numpy()
+        k = len(protos)
+        freq = np.zeros((len(team_ids), k), dtype=np.int64)
+        shot_total = np.zeros((len(team_ids), k))
+        action_total = np.zeros((len(team_ids), k))
+        for t, (team_id, near) in enumerate(zip(team_ids, nearest)):
+            pos = rows[team_id]
+            freq[t] = np.bincount(near, minlength=k)
+            shot_total[t] = np.bincount(near, weights=shots[pos], minlength=k)
+            action_total[t] = np.bincount(near, weights=lengths[pos], minlength=k)
+        share = freq / np.maximum(freq.sum(axis=1, keepdims=True), 1)
+        conversion = shot_total / np.maximum(action_total, 1)
+
+        names = {int(team["team_id"]): team["team_name"] for team in teams()}
+        # phase_id는 replay/similar에서 그대로 쓸 수 있는 기본 저장소 id
+        home = self.home_ids(protos)
+        prototypes = []
+        for p, pos in enumerate(protos.tolist()):
+            row = table.iloc[pos]
+            league_freq = int(freq[:, p].sum())
+            prototypes.append({
+                "prototype_id": p, "phase_id": home[p], "team_id": int(row["team_id"]),
+                "length": int(row["length"]),
+                "start_zone": zone_tag(row["start_x"], row["start_y"]),
+                "end_zone": zone_tag(row["end_x"], row["end_y"]),
+                "frequency": league_freq,
+                "shot_conversion_rate": round(float(shot_total[:, p].sum() / max(action_total[:, p].sum(), 1)), 3),
+                "teams": int((freq[:, p] > 0).sum()),
+            })
+        return {
+            "n_games": self.n_games,
+            "teams": [{"team_id": team_id, "team_name": names.get(team_id, ""), "phases": int(freq[t].sum())}
+                      for t, team_id in enumerate(team_ids)],
+            "prototypes": prototypes,
+            "frequency": freq.tolist(),
+            "share": np.round(share, 4).tolist(),
+            "shot_total": shot_total.astype(int).tolist(),
+            "conversion": np.round(conversion, 4).tolist(),
+        }
+
+
+# 리그 행렬 캐시 (세대별 메모리 + 디스크)
+LEAGUE_CACHE = FlightCache(maxsize=16)
+
+
+def league_path(n_games: int, n_protos: int, mark: tuple) -> Optional[Path]:
+    if not LEAGUE_DIR:
+        return None
+    digest = hashlib.blake2b(repr((mark, LEAGUE_FORMAT)).encode(), digest_size=8).hexdigest()
+    return Path(LEAGUE_DIR) / f"league_{n_games}_{n_protos}_{digest}.json"
+
+
+def _read_league(path: Optional[Path]) -> Optional[Dict]:
+    if path is None or not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def league_box(n_games: int, n_protos: int, mark: tuple, workers: Optional[int] = None) -> Dict:
+    def load() -> Dict:
+        path = league_path(n_games, n_protos, mark)
+        saved = _read_league(path)
+        if saved is not None:
+            return saved
+        result = LeagueAnalyzer(n_games, n_protos, workers=workers).data()
+        if path is not None and result:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(path.stem + f".{os.getpid()}.tmp")
+                tmp.write_text(json.dumps(result, ensure_ascii=False), encoding="utf-8")
+                os.replace(tmp, path)
+            except OSError:
+                pass
+        return result
+
+    return LEAGUE_CACHE.get(mark, (int(n_games), int(n_protos)), load)
+
+
+def league_ready(n_games: int, n_protos: int, mark: tuple) -> Optional[Dict]:
+    """League matrix from memory or the batch file, None when it still has to be computed."""
+    key = (int(n_games), int(n_protos))
+    cached = LEAGUE_CACHE.peek(mark, key)
+    if cached is not None or LEAGUE_CACHE.pending(mark, key):
+        return cached
+    saved = _read_league(league_path(n_games, n_protos, mark))
+    if saved is None:
+        return None
+    return LEAGUE_CACHE.get(mark, key, lambda: saved)
+
+
+def league_start(n_games: int, n_protos: int, mark: tuple) -> bool:
+    # 백그라운드 스레드에서 배치 계산 시작 (이미 계산 중이면 False)
+    if LEAGUE_CACHE.pending(mark, (int(n_games), int(n_protos))):
+        return False
+    Thread(target=league_box, args=(n_games, n_protos, mark), daemon=True).start()
+    return True
@@ -2,12 +2,22 @@
 import pandas as pd
 import numpy as np
 import networkx as nx
-from typing import Dict, List
-from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
 import math
+import os
+from concurrent.futures import Future, wait
+from threading import Lock
+from scipy import sparse
 
-from ..core.data import team_events
+from ..core.cache import FlightCache
+from ..core.data import data_stamp, matches, recent_games, teams
+from ..core.pool import POOL_WORKERS, process_pool
 from ..core.spec import Analyzer
+from ..net.graph import adj_mat, between_cent, degree_cent, impact_table, page_rank
+from ..net.pairs import pass_pairs, team_pairs
+
+# 중심성 계산 엔진 (sparse: scipy 희소 행렬, networkx: 기존 그래프 라이브러리)
+NET_ENGINE = os.getenv("NET_ENGINE", "sparse")
 
 
 def num(value, default=0.0):
@@ -29,49 +39,51 @@ def num_int(value, default=0):
         return default
 
 
+def net_stats(adj):
+    # 희소 인접 행렬의 (degree, betweenness, pagerank) - 실패 시 networkx 경로와 같은 기본값
+    n = adj.shape[0]
+    try: degree = degree_cent(adj)
+    except Exception: degree = np.zeros(n)
+    try: betweenness = between_cent(adj)
+    except Exception: betweenness = np.zeros(n)
+    try: pagerank = page_rank(adj)
+    except Exception: pagerank = np.full(n, 1.0 / max(n, 1))
+    return degree, betweenness, pagerank
+
+
 class NetworkAnalyzer(Analyzer):
-    def __init__(self, events_df: pd.DataFrame, limit: int = 2):
+    def __init__(
+        self, events_df: Optional[pd.DataFrame] = None, limit: int = 2, engine: str = NET_ENGINE,
+        table: Optional[pd.DataFrame] = None
+    ):
+        if engine not in ("sparse", "networkx"):
+            raise ValueError("engine must be 'sparse' or 'networkx'")
+        if events_df is None and table is None:
+            raise ValueError("events_df or table is required")
         self.events = events_df
+        self.table = table
         self.graph = None
         self.player_stats = {}
         self.passes = None
+        self.pairs = None
+        self._mat = None
+        self._cent = None
+        self._impact = None
+        self._net = None
+        self._pos = None
         self.limit = limit
+        self.engine = engine
         
     def net_graph(self) -> nx.DiGraph:
         self.graph = nx.DiGraph()
-        pass_cols = [
-            "game_id",
-            "action_id",
-            "team_id",
-            "player_id",
-            "player_name_ko",
-            "position_name",
-            "main_position",
-            "start_x",
-            "start_y",
-        ]
-        recv_cols = ["game_id", "action_id", "team_id", "player_id"]
-        passes = self.events[self.events["type_name"] == "Pass"][pass_cols].copy()
-        received = self.events[self.events["type_name"] == "Pass Received"][recv_cols].copy()
-
-        if passes.empty:
-            return self.graph
-
-        passes["action_id"] = pd.to_numeric(passes["action_id"], errors="coerce")
-        received["action_id"] = pd.to_numeric(received["action_id"], errors="coerce")
-        passes = passes.dropna(subset=["game_id", "team_id", "action_id", "player_id"])
-        received = received.dropna(subset=["game_id", "team_id", "action_id", "player_id"])
-        passes["game_id"] = passes["game_id"].astype(int)
-        passes["team_id"] = passes["team_id"].astype(int)
-        passes["action_id"] = passes["action_id"].astype(int)
-        received["game_id"] = received["game_id"].astype(int)
-        received["team_id"] = received["team_id"].astype(int)
-        received["action_id"] = received["action_id"].astype(int)
-        self.passes = passes
-        if passes.empty:
+        self._mat = self._cent = self._impact = self._net = self._pos = None
+        # 리그 패스 쌍 테이블 슬라이스가 있으면 재매칭 없이 사용
+        table = self.table if self.table is not None else pass_pairs(self.events)
+        self.passes = table
+        if table.empty:
             return self.graph
 
-        node_rows = passes.drop_duplicates("player_id")
+        node_rows = table.drop_duplicates("player_id")
         for _, row in node_rows.iterrows():
             player_id = row.get("player_id")
             if pd.isna(player_id):
@@ -83,30 +95,8 @@ class NetworkAnalyzer(Analyzer):
                 main_position=str(row.get("main_position", "Unknown")),
             )
 
-        if received.empty:
-            return self.graph
-
-        action_max = int(max(passes["action_id"].max(), received["action_id"].max()))
-        team_max = int(max(passes["team_id"].max(), received["team_id"].max()))
-        action_mult = action_max + 1
-        team_mult = action_mult * (team_max + 1)
-        passes["key"] = passes["game_id"] * team_mult + passes["team_id"] * action_mult + passes["action_id"]
-        received["key"] = received["game_id"] * team_mult + received["team_id"] * action_mult + received["action_id"]
-        passes = passes.sort_values("key")
-        received = received.sort_values("key")
-
-        pairs = pd.merge_asof(
-            passes,
-            received,
-            on="key",
-            direction="forward",
-            suffixes=("", "_recv"),
-        )
-        pairs = pairs.dropna(subset=["player_id_recv"])
-        pairs["action_gap"] = pairs["action_id_recv"] - pairs["action_id"]
-        pairs = pairs[pairs["action_gap"] >= 0]
-        pairs = pairs[pairs["action_gap"] <= 30]
-        pairs = pairs[pairs["player_id"] != pairs["player_id_recv"]]
+        pairs = table[table["player_id_recv"] >= 0]
+        self.pairs = pairs
         if pairs.empty:
             return self.graph
 
@@ -115,17 +105,57 @@ class NetworkAnalyzer(Analyzer):
             .size()
             .reset_index(name="weight")
         )
-        for _, row in edge_counts.iterrows():
-            passer = num_int(row.get("player_id"))
-            receiver = num_int(row.get("player_id_recv"))
-            if passer in self.graph.nodes and receiver in self.graph.nodes:
-                self.graph.add_edge(passer, receiver, weight=num_int(row.get("weight", 1)))
+        passers = edge_counts["player_id"].to_numpy(dtype=np.int64)
+        receivers = edge_counts["player_id_recv"].to_numpy(dtype=np.int64)
+        known = np.isin(passers, list(self.graph.nodes)) & np.isin(receivers, list(self.graph.nodes))
+        self.graph.add_weighted_edges_from(
+            zip(passers[known].tolist(), receivers[known].tolist(), edge_counts["weight"].to_numpy()[known].tolist())
+        )
         
         return self.graph
-    
+
+    def net_mat(self):
+        # 그래프 노드 순서의 가중 인접 행렬 (패스 쌍 테이블에서 직접 생성)
+        if self.graph is None: self.net_graph()
+        if self._mat is not None: return self._mat
+        nodes = np.fromiter(self.graph.nodes, dtype=np.int64, count=len(self.graph.nodes))
+        pairs = self.pairs
+        if pairs is None or pairs.empty or len(nodes) == 0:
+            self._mat = nodes, adj_mat(np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), len(nodes))
+            return self._mat
+        order = np.argsort(nodes, kind="stable")
+        sorted_nodes = nodes[order]
+        src = pairs["player_id"].to_numpy(dtype=np.int64)
+        dst = pairs["player_id_recv"].to_numpy(dtype=np.int64)
+        src_pos = np.minimum(np.searchsorted(sorted_nodes, src), len(nodes) - 1)
+        dst_pos = np.minimum(np.searchsorted(sorted_nodes, dst), len(nodes) - 1)
+        known = (sorted_nodes[src_pos] == src) & (sorted_nodes[dst_pos] == dst)
+        self._mat = nodes, adj_mat(order[src_pos[known]], order[dst_pos[known]], np.ones(int(known.sum())), len(nodes))
+        return self._mat
+
+    def sparse_cent(self):
+        # (degree, betweenness, pagerank, 받은 패스, 한 패스) 배열 - 노드 순서는 self.graph.nodes
+        nodes, adj = self.net_mat()
+        degree, betweenness, pagerank = net_stats(adj)
+        in_degree = np.asarray(adj.sum(axis=0)).ravel()
+        out_degree = np.asarray(adj.sum(axis=1)).ravel()
+        return nodes, degree, betweenness, pagerank, in_degree, out_degree
+
     def cent(self) -> Dict:
         if self.graph is None: self.net_graph()
         if len(self.graph.nodes) == 0: return {}
+        if self._cent is None: self._cent = self.engine_cent()
+        return self._cent
+
+    def engine_cent(self) -> Dict:
+        if self.engine == "sparse":
+            nodes, degree, betweenness, pagerank, in_deg, out_deg = self.sparse_cent()
+            degree_cent = dict(zip(nodes.tolist(), degree.tolist()))
+            betweenness_cent = dict(zip(nodes.tolist(), betweenness.tolist()))
+            pagerank = dict(zip(nodes.tolist(), pagerank.tolist()))
+            in_degree = dict(zip(nodes.tolist(), in_deg.tolist()))
+            out_degree = dict(zip(nodes.tolist(), out_deg.tolist()))
+            return self.cent_rows(degree_cent, betweenness_cent, pagerank, in_degree, out_degree)
         
         try: degree_cent = nx.degree_centrality(self.graph)
         except: degree_cent = {n: 0 for n in self.graph.nodes}
@@ -136,7 +166,9 @@ class NetworkAnalyzer(Analyzer):
         
         in_degree = dict(self.graph.in_degree(weight='weight'))
         out_degree = dict(self.graph.out_degree(weight='weight'))
-        
+        return self.cent_rows(degree_cent, betweenness_cent, pagerank, in_degree, out_degree)
+
+    def cent_rows(self, degree_cent, betweenness_cent, pagerank, in_degree, out_degree) -> Dict:
         result = {}
         for node in self.graph.nodes:
             node_data = self.graph.nodes[node]
@@ -194,60 +226,98 @@ class NetworkAnalyzer(Analyzer):
         
         return connections
     
-    def impact_stat(self, player_id) -> Dict:
-        default = {'impact_score': 0, 'edges_removed': 0, 'component_change': 0, 'description': '압박 타겟'}
-        if self.graph is None or player_id not in self.graph.nodes: return default
+    def impact_map(self) -> Dict:
+        # 모든 선수의 제거 영향 (관절점 1회 탐색 + 차수 합) - 허브 목록과 압박 타겟 순위가 공유
+        if self._impact is not None: return self._impact
+        if self.graph is None: self.net_graph()
+        nodes, adj = self.net_mat()
+        self._impact = {}
+        if adj.nnz == 0:
+            for node in nodes.tolist():
+                self._impact[node] = {'impact_score': 0, 'edges_removed': 0, 'component_change': 0, 'description': '압박 타겟'}
+            return self._impact
         
-        try:
-            original_edges = self.graph.number_of_edges()
-            if original_edges == 0: return default
-            
-            test_graph = self.graph.copy()
-            test_graph.remove_node(player_id)
-            edges_removed = original_edges - test_graph.number_of_edges()
-            
-            try:
-                component_change = nx.number_weakly_connected_components(test_graph) - nx.number_weakly_connected_components(self.graph)
-            except:
-                component_change = 0
-            
-            impact_score = min(100, int((edges_removed / max(original_edges, 1) * 50) + (component_change * 25)))
-            player_name = str(self.graph.nodes[player_id].get('name', ''))
-            
-            if impact_score >= 70: desc = f"{player_name} 최우선 압박 타겟"
-            elif impact_score >= 40: desc = f"{player_name} 압박 권장"
+        edges_removed, component_change, impact_score = impact_table(adj)
+        for node, edges, change, score in zip(nodes.tolist(), edges_removed.tolist(), component_change.tolist(), impact_score.tolist()):
+            player_name = str(self.graph.nodes[node].get('name', ''))
+            if score >= 70: desc = f"{player_name} 최우선 압박 타겟"
+            elif score >= 40: desc = f"{player_name} 압박 권장"
             else: desc = f"{player_name} 보조 타겟"
-            
-            return {'impact_score': num_int(impact_score), 'edges_removed': num_int(edges_removed),
-                    'component_change': num_int(component_change), 'description': desc}
-        except:
-            return default
+            self._impact[node] = {'impact_score': num_int(score), 'edges_removed': num_int(edges),
+                                  'component_change': num_int(change), 'description': desc}
+        return self._impact
+    
+    def impact_stat(self, player_id) -> Dict:
+        default = {'impact_score': 0, 'edges_removed': 0, 'component_change': 0, 'description': '압박 타겟'}
+        try: return dict(self.impact_map().get(player_id, default))
+        except: return default
+    
+    def target_list(self, n_top: int = 10) -> List[Dict]:
+        # 압박 타겟 순위 - 제거 영향 점수, 같으면 허브 점수 순
+        cent = self.cent()
+        if not cent: return []
+        impact = self.impact_map()
+        ranked = sorted(cent.items(), key=lambda x: (impact[x[0]]['impact_score'], x[1]['hub_score']), reverse=True)
+        return [{
+            'rank': rank, 'player_id': num_int(player_id), 'player_name': str(stats['name']),
+            'position': str(stats['position']), 'hub_score': num(stats['hub_score']),
+            'passes_received': num_int(stats['passes_received']), 'passes_made': num_int(stats['passes_made']),
+            **impact[player_id]
+        } for rank, (player_id, stats) in enumerate(ranked[:n_top], 1)]
     
+    def pos_stats(self):
+        # 노드 순서의 (패스 수, 평균 x, 평균 y) 배열 - 패스 테이블 groupby 1회 (패스 없는 좌표는 NaN)
+        if self._pos is not None: return self._pos
+        nodes, _ = self.net_mat()
+        passes = self.passes
+        if passes is None or passes.empty:
+            self._pos = np.zeros(len(nodes), dtype=np.int64), np.full(len(nodes), np.nan), np.full(len(nodes), np.nan)
+            return self._pos
+        grouped = passes.groupby(passes['player_id'].to_numpy(dtype=np.int64)).agg(
+            count=('player_id', 'size'), avg_x=('start_x', 'mean'), avg_y=('start_y', 'mean')
+        ).reindex(nodes)
+        self._pos = (
+            grouped['count'].fillna(0).to_numpy(dtype=np.int64),
+            grouped['avg_x'].to_numpy(dtype=np.float64),
+            grouped['avg_y'].to_numpy(dtype=np.float64),
+        )
+        return self._pos
+
     def net_data(self) -> Dict:
         if self.graph is None: self.net_graph()
+        if self._net is not None: return self._net
         
         cent = self.cent()
-        passes = self.passes
-        if passes is None:
-            passes = self.events[self.events['type_name'] == 'Pass'].copy()
+        nodes_ids, _ = self.net_mat()
+        _, avg_x, avg_y = self.pos_stats()
         
         nodes = []
-        for node_id in self.graph.nodes:
+        for i, node_id in enumerate(nodes_ids.tolist()):
             node_data = self.graph.nodes[node_id]
             c = cent.get(node_id, {})
-            player_passes = passes[passes['player_id'] == node_id]
             nodes.append({
                 'id': str(node_id), 'name': str(node_data.get('name', str(node_id))),
                 'position': str(node_data.get('position', '')), 'hub_score': num(c.get('hub_score', 0)),
                 'passes_total': num_int(c.get('passes_received', 0)) + num_int(c.get('passes_made', 0)),
-                'avg_x': round(num(player_passes['start_x'].mean(), 50), 1),
-                'avg_y': round(num(player_passes['start_y'].mean(), 34), 1)
+                'avg_x': round(num(avg_x[i], 50), 1),
+                'avg_y': round(num(avg_y[i], 34), 1)
             })
         
         edges = [{'source': str(s), 'target': str(t), 'weight': num_int(d.get('weight', 1))} 
                  for s, t, d in self.graph.edges(data=True)]
         
-        return {'nodes': nodes, 'edges': edges}
+        self._net = {'nodes': nodes, 'edges': edges}
+        return self._net
+
+    def art(self) -> "NetworkAnalyzer":
+        # 캐시용 결과물 - 인접 행렬, 중심성, 제거 영향, 그래프 데이터를 채우고 이벤트 원본은 버림
+        self.net_mat()
+        self.cent()
+        self.impact_map()
+        self.pos_stats()
+        self.net_data()
+        self.events = self.table = self.passes = self.pairs = None
+        return self
 
     def data(self) -> Dict:
         return {'hubs': self.hub_list(self.limit), 'network': self.net_data()}
@@ -258,9 +328,172 @@ def team_net(events_df: pd.DataFrame, n_hubs: int = 2) -> Dict:
     return analyzer.data()
 
 
-@lru_cache(maxsize=128)
+# 팀 네트워크 결과물 캐시 (team_id, n_games) - 세대(data_stamp)별, 동시 요청은 계산 1회 공유
+NET_CACHE = FlightCache(maxsize=128)
+
+
+def net_art(team_id: int, n_games: int, mark: tuple) -> Optional[NetworkAnalyzer]:
+    def load() -> Optional[NetworkAnalyzer]:
+        table = team_pairs(team_id, n_games)
+        if len(table) == 0:
+            return None
+        return NetworkAnalyzer(table=table).art()
+
+    return NET_CACHE.get(mark, (int(team_id), int(n_games)), load)
+
+
 def net_box(team_id: int, n_games: int, n_hubs: int, mark: tuple) -> Dict:
-    events = team_events(team_id, n_games)
-    if len(events) == 0:
+    analyzer = net_art(team_id, n_games, mark)
+    if analyzer is None:
         return {}
-    return team_net(events, n_hubs)
+    return {'hubs': analyzer.hub_list(n_hubs), 'network': analyzer.net_data()}
+
+
+class NetTimeline(Analyzer):
+    """Hub scores per match and over rolling windows of ``window`` matches.
+
+    Pair counts are binned into one adjacency per game once; any window is a
+    difference of prefix sums, and centralities run only on those sums
+    restricted to the players who passed in the window (as in ``cent()``).
+    """
+
+    def __init__(self, table: pd.DataFrame, games: List[int], window: int = 5):
+        self.table = table
+        self.games = list(games)
+        self.window = window
+
+    def game_mats(self):
+        # (선수 id, 경기별 인접 행렬 누적합, 경기별 패스 수 누적합) - 누적합 0번은 빈 구간
+        table = self.table
+        players = table.drop_duplicates("player_id")["player_id"].to_numpy(dtype=np.int64)
+        pos = pd.Index(players)
+        game_pos = pd.Index(self.games).get_indexer(table["game_id"])
+        src = pos.get_indexer(table["player_id"].to_numpy(dtype=np.int64))
+        n_games, n = len(self.games), len(players)
+        mats = np.zeros((n_games + 1, n, n))
+        counts = np.zeros((n_games + 1, n))
+        np.add.at(counts, (game_pos + 1, src), 1)
+        dst = pos.get_indexer(table["player_id_recv"].to_numpy(dtype=np.int64))
+        paired = (dst >= 0) & (dst != src)
+        np.add.at(mats, (game_pos[paired] + 1, src[paired], dst[paired]), 1)
+        return players, np.cumsum(mats, axis=0), np.cumsum(counts, axis=0)
+
+    def hub_row(self, mat: np.ndarray, counts: np.ndarray) -> List[Optional[float]]:
+        # 구간 합 행렬의 허브 점수 (구간에 패스가 없는 선수는 None)
+        active = np.flatnonzero(counts > 0)
+        row = [None] * len(counts)
+        if len(active) == 0:
+            return row
+        degree, betweenness, pagerank = net_stats(sparse.csr_matrix(mat[np.ix_(active, active)]))
+        hub = 0.3 * degree + 0.4 * betweenness + 0.3 * pagerank
+        for i, score in zip(active.tolist(), hub.tolist()):
+            row[i] = round(num(score), 4)
+        return row
+
+    def data(self) -> Dict:
+        if len(self.table) == 0 or not self.games:
+            return {}
+        players, mats, counts = self.game_mats()
+        n_games = len(self.games)
+        match_hub = [self.hub_row(mats[g + 1] - mats[g], counts[g + 1] - counts[g]) for g in range(n_games)]
+        window = min(self.window, n_games)
+        rolling = []
+        for end in range(window, n_games + 1):
+            start = end - window
+            rolling.append({
+                'start_game_id': int(self.games[start]), 'end_game_id': int(self.games[end - 1]),
+                'hub_score': self.hub_row(mats[end] - mats[start], counts[end] - counts[start])
+            })
+
+        names = self.table.drop_duplicates("player_id").set_index("player_id")
+        match_df = matches()
+        dates = dict(zip(match_df['game_id'], match_df['game_date'].astype(str)))
+        return {
+            'window': window,
+            'games': [{'game_id': int(g), 'game_date': dates.get(g, '')} for g in self.games],
+            'players': [{'player_id': int(p), 'name': str(names.at[p, 'player_name_ko']) if 'player_name_ko' in names else str(p),
+                         'position': str(names.at[p, 'position_name']) if 'position_name' in names else ''}
+                        for p in names.index],
+            'match_hub': match_hub,
+            'rolling_hub': rolling
+        }
+
+
+# 팀 허브 타임라인 캐시 (team_id, n_games, window)
+TIMELINE_CACHE = FlightCache(maxsize=64)
+
+
+def net_timeline(team_id: int, n_games: int, window: int, mark: tuple) -> Dict:
+    def load() -> Dict:
+        # 경기 순서는 과거 → 최근
+        games = recent_games(team_id, n_games)[::-1]
+        table = team_pairs(team_id, n_games)
+        return NetTimeline(table, games, window).data()
+
+    return TIMELINE_CACHE.get(mark, (int(team_id), int(n_games), int(window)), load)
+
+
+# 시작 시 미리 계산할 n_games 값 (쉼표 구분)
+NET_WARM_GAMES = tuple(int(v) for v in os.getenv("NET_WARM_GAMES", "5,100").split(",") if v.strip())
+# 워밍업 진행 상황 (/api/network/warmup)
+NET_WARM = {"state": "idle", "total": 0, "done": 0, "failed": 0, "skipped": 0}
+_warm_lock = Lock()
+
+
+def _net_task(table: pd.DataFrame) -> Optional[NetworkAnalyzer]:
+    if len(table) == 0:
+        return None
+    return NetworkAnalyzer(table=table).art()
+
+
+def _relay(job: Future, work: Future) -> None:
+    # 프로세스 풀 결과를 캐시에 등록된 Future로 전달
+    error = job.exception()
+    if error is None:
+        work.set_result(job.result())
+    else:
+        work.set_exception(error)
+
+
+def net_warm(n_games_list: Sequence[int] = NET_WARM_GAMES, workers: Optional[int] = None) -> Dict:
+    """Build the network artifact of every team for each ``n_games`` ahead of requests.
+
+    Each job is attached to ``NET_CACHE`` before it is submitted, so requests
+    arriving mid-warmup wait for the running job instead of duplicating it.
+    """
+    mark = data_stamp()
+    workers = POOL_WORKERS if workers is None else int(workers)
+    keys = [(int(team["team_id"]), int(n)) for n in n_games_list for team in teams()]
+    with _warm_lock:
+        NET_WARM.update(state="running", total=len(keys), done=0, failed=0, skipped=0)
+
+    def track(work: Future) -> None:
+        with _warm_lock:
+            NET_WARM["failed" if work.exception() is not None else "done"] += 1
+
+    # 모든 키를 먼저 등록한 뒤 작업을 제출 (그 사이 들어온 요청도 합류)
+    jobs = []
+    for key in keys:
+        work = Future()
+        if NET_CACHE.attach(mark, key, work):
+            work.add_done_callback(track)
+            jobs.append((key, work))
+        else:
+            with _warm_lock:
+                NET_WARM["skipped"] += 1
+
+    pool = process_pool(workers) if workers > 1 and len(jobs) > 1 else None
+    for key, work in jobs:
+        try:
+            table = team_pairs(*key)
+            if pool is not None:
+                pool.submit(_net_task, table).add_done_callback(lambda job, work=work: _relay(job, work))
+            else:
+                work.set_result(_net_task(table))
+        except Exception as e:
+            work.set_exception(e)
+
+    wait([work for _, work in jobs])
+    with _warm_lock:
+        NET_WARM["state"] = "finished"
+        return dict(NET_WARM)
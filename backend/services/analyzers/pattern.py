@@ -1,65 +1,182 @@
 # Phase splitting and tactic pattern mining (Decroos et al. aligned)
 from __future__ import annotations
 
-from collections import Counter
-from typing import Dict, Iterable, List, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
+from threading import Lock
+from typing import Dict, List, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
 from scipy.cluster.hierarchy import linkage, fcluster
 from scipy.spatial.distance import squareform
 
+from ..core.cache import FlightCache
+from ..core.data import data_stamp, match_events, teams
+from ..core.phase import (
+    MIN_PHASE_EVENTS,
+    PHASE_GAP_SECONDS,
+    PHASE_ORDER,
+    PhaseIndex,
+    phase_bounds,
+    phase_rows,
+    phase_store,
+)
 from ..core.spadl import action_rows, spadl_map
 from ..core.spec import Analyzer
+from ..dtw.bound import dtw_knn
+from ..dtw.embed import EMBED_POINTS, EmbedIndex, resample
+from ..dtw.kernel import dtw_dist
+from ..dtw.matrix import pair_mat, proto_near
+from ..dtw.simplify import SIMPLIFY_MODE, SIMPLIFY_POINTS, simplify_list
+from ..dtw.store import cached_mat, seq_key
+
+ZONE_X = ("수비", "중앙", "공격", "박스")
+ZONE_Y = ("좌측", "중앙", "우측")
+N_ZONES = len(ZONE_X) * len(ZONE_Y)
+TOKEN_SPAN = N_ZONES * (N_ZONES + 1)
+MOVE_ACTIONS = {"pass", "cross", "corner_crossed", "freekick_crossed", "throw_in", "goal_kick", "dribble"}
+SEQ_WEIGHTS = {"shot": 2.0, "pass": 0.5}
+FEATURE_COLS = (
+    "length", "duration", "start_x", "start_y", "end_x", "end_y", "avg_x", "avg_y",
+    "pass_count", "carry_count", "forward_progress", "lateral_movement",
+)
+PHASE_FEATURES = FEATURE_COLS + ("shot_count", "cross_count", "success_rate")
+# 증분 군집: 평균 프로토타입 거리 증가 비율 / 교체 Phase 비율이 넘으면 전체 재군집
+# (교체 비율은 추가·제거 중 큰 쪽 기준이라 2~3경기 창에서도 1경기 교체는 증분 갱신)
+DRIFT_LIMIT = 1.5
+TURNOVER_LIMIT = 0.5
+# 보관하는 증분 상태 최대 개수 (LRU)
+STATE_MAX = 64
+# 유사 Phase 검색에서 DTW로 재정렬할 최대 후보 수
+SIMILAR_POOL_MAX = 200
+
+
+def zone_tag(x: float, y: float) -> str:
+    x_zone = "수비" if x < 35 else ("중앙" if x < 70 else "공격")
+    y_zone = "좌측" if y < 22.67 else ("중앙" if y < 45.33 else "우측")
+    if x >= 88.5:
+        x_zone = "박스"
+    return f"{x_zone}_{y_zone}"
+
+
+def zone_ids(xs: np.ndarray, ys: np.ndarray) -> np.ndarray:
+    # Same cut points as zone_tag; NaN lands in 공격/우측 like the scalar comparisons
+    x_zone = np.where(xs >= 88.5, 3, np.digitize(xs, [35, 70]))
+    return x_zone * len(ZONE_Y) + np.digitize(ys, [22.67, 45.33])
+
+
+def _coord(events: pd.DataFrame, col: str, default: np.ndarray) -> np.ndarray:
+    if col not in events.columns:
+        return default
+    values = pd.to_numeric(events[col], errors="coerce").to_numpy(dtype=float)
+    # scalar path used `value or default`: 0 falls back, NaN is kept
+    return np.where(values == 0, default, values)
+
+
+def token_codes(events: pd.DataFrame) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """Int token per row, the action vocabulary and the action-row mask.
+
+    token = (action * N_ZONES + start_zone) * (N_ZONES + 1) + end_slot, where
+    end_slot is the end zone for moving actions and N_ZONES ("AT") otherwise.
+    """
+    if "spadl_type" not in events.columns:
+        events = spadl_map(events)
+    if events.empty:
+        return np.zeros(0, dtype=np.int64), [], np.zeros(0, dtype=bool)
+    keep = events["spadl_type"].notna().to_numpy()
+    actions = pd.Categorical(events["spadl_type"].astype(object).where(keep, "other").astype(str))
+    vocab = [str(c) for c in actions.categories]
+    zero = np.zeros(len(events))
+    sx = _coord(events, "start_x", zero)
+    sy = _coord(events, "start_y", zero)
+    ex = _coord(events, "end_x", sx)
+    ey = _coord(events, "end_y", sy)
+    moving = np.isin(np.asarray(vocab, dtype=object), list(MOVE_ACTIONS))[actions.codes]
+    end_slot = np.where(moving, zone_ids(ex, ey), N_ZONES)
+    codes = (actions.codes.astype(np.int64) * N_ZONES + zone_ids(sx, sy)) * (N_ZONES + 1) + end_slot
+    return codes, vocab, keep
+
+
+def token_text(token: int, vocab: List[str]) -> str:
+    action, rest = divmod(int(token), TOKEN_SPAN)
+    start, end = divmod(rest, N_ZONES + 1)
+    start_zone = f"{ZONE_X[start // len(ZONE_Y)]}_{ZONE_Y[start % len(ZONE_Y)]}"
+    if end == N_ZONES:
+        return f"{vocab[action]} AT {start_zone}"
+    end_zone = f"{ZONE_X[end // len(ZONE_Y)]}_{ZONE_Y[end % len(ZONE_Y)]}"
+    return f"{vocab[action]} FROM {start_zone} TO {end_zone}"
+
+
+def phase_feats(index: PhaseIndex) -> pd.DataFrame:
+    """``PhaseAnalyzer.phase_stats`` numeric features for every phase at once.
+
+    One row per phase in ``PHASE_FEATURES`` order. Sums and means are
+    segment reductions over the phase offsets, with the same NaN handling as
+    the per-phase pandas version (sums skip NaN, first/last rows keep it).
+    """
+    events = index.events
+    n_rows = len(events)
+    first, last = index.starts, index.stops - 1
+
+    def col(name: str) -> np.ndarray:
+        if name not in events.columns:
+            return np.zeros(n_rows)
+        return pd.to_numeric(events[name], errors="coerce").to_numpy(dtype=float)
+
+    def total(values: np.ndarray) -> np.ndarray:
+        return index.reduce(np.add, np.where(np.isnan(values), 0.0, values)).astype(float)
+
+    def mean(name: str) -> np.ndarray:
+        if name not in events.columns:
+            return np.zeros(len(index))
+        values = col(name)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return total(values) / index.reduce(np.add, ~np.isnan(values))
+
+    types = events["type_name"].to_numpy() if "type_name" in events.columns else np.full(n_rows, None)
+    times = col("time_seconds")
+    feats = {
+        "length": index.lengths().astype(float),
+        "duration": index.reduce(np.fmax, times) - index.reduce(np.fmin, times),
+        "start_x": col("start_x")[first],
+        "start_y": col("start_y")[first],
+        "end_x": col("end_x")[last],
+        "end_y": col("end_y")[last],
+        "avg_x": mean("start_x"),
+        "avg_y": mean("start_y"),
+        "pass_count": index.reduce(np.add, types == "Pass").astype(float),
+        "carry_count": index.reduce(np.add, types == "Carry").astype(float),
+        "forward_progress": total(col("dx")),
+        "lateral_movement": total(np.abs(col("dy"))),
+        "shot_count": index.reduce(np.add, types == "Shot").astype(float),
+        "cross_count": index.reduce(np.add, types == "Cross").astype(float),
+        "success_rate": np.zeros(len(index)),
+    }
+    if "result_name" in events.columns:
+        results = events["result_name"]
+        done = index.reduce(np.add, results.notna().to_numpy())
+        hits = index.reduce(np.add, (results == "Successful").to_numpy())
+        feats["success_rate"] = np.where(done > 0, hits / np.maximum(done, 1), 0.0)
+    return pd.DataFrame(feats, columns=list(PHASE_FEATURES))
 
 
 class PhaseAnalyzer(Analyzer):
-    PHASE_GAP_SECONDS = 10
-    MIN_PHASE_EVENTS = 3
+    PHASE_GAP_SECONDS = PHASE_GAP_SECONDS
+    MIN_PHASE_EVENTS = MIN_PHASE_EVENTS
 
     def __init__(self, events_df: pd.DataFrame):
-        self.events = events_df.sort_values(["game_id", "period_id", "time_seconds", "action_id"])
-
-    def phase_list(self) -> List[pd.DataFrame]:
-        phases: List[pd.DataFrame] = []
-
-        for game_id in self.events["game_id"].unique():
-            game_events = self.events[self.events["game_id"] == game_id].reset_index(drop=True)
-            if game_events.empty:
-                continue
-
-            current_phase: List[pd.Series] = []
-            prev_time = None
-            prev_team = None
-            prev_period = None
-
-            for _, row in game_events.iterrows():
-                curr_time = row.get("time_seconds", 0)
-                curr_team = row.get("team_id", None)
-                curr_period = row.get("period_id", None)
-                new_phase = False
+        self.events = events_df.sort_values(PHASE_ORDER).reset_index(drop=True)
+        self._index: Optional[PhaseIndex] = None
 
-                if prev_time is not None:
-                    if curr_time - prev_time > self.PHASE_GAP_SECONDS:
-                        new_phase = True
-                    elif prev_team is not None and curr_team is not None and curr_team != prev_team:
-                        new_phase = True
-                    elif prev_period is not None and curr_period is not None and curr_period != prev_period:
-                        new_phase = True
+    def phase_index(self) -> PhaseIndex:
+        if self._index is None:
+            starts, stops = phase_bounds(self.events, self.PHASE_GAP_SECONDS, self.MIN_PHASE_EVENTS)
+            self._index = PhaseIndex(self.events, phase_rows(len(self.events), starts, stops), starts, stops)
+        return self._index
 
-                if new_phase and len(current_phase) >= self.MIN_PHASE_EVENTS:
-                    phases.append(pd.DataFrame(current_phase))
-                    current_phase = []
-
-                current_phase.append(row)
-                prev_time = curr_time
-                prev_team = curr_team
-                prev_period = curr_period
-
-            if len(current_phase) >= self.MIN_PHASE_EVENTS:
-                phases.append(pd.DataFrame(current_phase))
-
-        return phases
+    def phase_list(self) -> List[pd.DataFrame]:
+        return list(self.phase_index())
 
     def data(self) -> List[pd.DataFrame]:
         return self.phase_list()
@@ -94,120 +211,167 @@ class PhaseAnalyzer(Analyzer):
         return features
 
     def zone_tag(self, x: float, y: float) -> str:
-        x_zone = "수비" if x < 35 else ("중앙" if x < 70 else "공격")
-        y_zone = "좌측" if y < 22.67 else ("중앙" if y < 45.33 else "우측")
-        if x >= 88.5:
-            x_zone = "박스"
-        return f"{x_zone}_{y_zone}"
+        return zone_tag(x, y)
 
 
 class PatternMiner(Analyzer):
-    def __init__(self, phases: List[pd.DataFrame], limit: int = 3):
+    def __init__(
+        self,
+        phases: Union[PhaseIndex, List[pd.DataFrame]],
+        limit: int = 3,
+        dtw_mode: str = "fast",
+        band: Optional[int] = None,
+        workers: Optional[int] = None,
+        cutoff: Optional[float] = None,
+        cache: bool = True,
+        cluster_mode: str = "exact",
+        landmarks: int = 200,
+        max_gap: Optional[int] = None,
+        simplify: Optional[str] = SIMPLIFY_MODE or None,
+        max_points: int = SIMPLIFY_POINTS,
+    ):
         self.phases = phases
         self.phase_stats: List[Dict] = []
+        self.features: Optional[pd.DataFrame] = None
         self.limit = limit
-
-    def _phase_stats(self, phase: pd.DataFrame) -> Dict:
-        analyzer = PhaseAnalyzer(phase)
-        return analyzer.phase_stats(phase)
-
-    def feat_list(self):
-        self.phase_stats = []
-        for i, phase in enumerate(self.phases):
-            features = self._phase_stats(phase)
+        self.dtw_mode = dtw_mode
+        self.band = band
+        self.workers = workers
+        self.cutoff = cutoff
+        self.cache = cache
+        self.cluster_mode = cluster_mode
+        self.landmarks = landmarks
+        self.max_gap = max_gap
+        self.simplify = simplify
+        self.max_points = max_points
+        self.vocab: List[str] = []
+        self._tokens: Optional[List[List[int]]] = None
+        self._seqs: Optional[List[np.ndarray]] = None
+        self.dtw_stats: Dict = {}
+        self.marks: Optional[np.ndarray] = None
+        self.mark_dist: Optional[np.ndarray] = None
+
+    def phase_index(self) -> PhaseIndex:
+        # list inputs are packed into one offset index
+        if isinstance(self.phases, PhaseIndex):
+            return self.phases
+        frames = list(self.phases)
+        events = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        stops = np.cumsum([len(p) for p in frames]).astype(np.int64)
+        starts = stops - np.array([len(p) for p in frames], dtype=np.int64)
+        return PhaseIndex(events, phase_rows(len(events), starts, stops), starts, stops)
+
+    def feat_mat(self) -> pd.DataFrame:
+        if self.features is None:
+            self.features = phase_feats(self.phase_index())
+        return self.features
+
+    def feat_list(self) -> List[Dict]:
+        self.phase_stats = self.feat_mat().to_dict("records")
+        for i, features in enumerate(self.phase_stats):
             features["phase_id"] = i
-            self.phase_stats.append(features)
         return self.phase_stats
 
     def dtw_dist(self, seq_a: np.ndarray, seq_b: np.ndarray) -> float:
-        n, m = len(seq_a), len(seq_b)
-        if n == 0 or m == 0:
-            return float("inf")
-        dp = np.full((n + 1, m + 1), np.inf)
-        dp[0, 0] = 0.0
-        for i in range(1, n + 1):
-            for j in range(1, m + 1):
-                cost = np.linalg.norm(seq_a[i - 1] - seq_b[j - 1])
-                dp[i, j] = cost + min(dp[i - 1, j], dp[i, j - 1], dp[i - 1, j - 1])
-        return float(dp[n, m])
+        return dtw_dist(seq_a, seq_b, self.dtw_mode, self.band)
 
     def phase_seq(self, phase: pd.DataFrame) -> np.ndarray:
         xs = pd.to_numeric(phase.get("start_x", 0), errors="coerce").fillna(0).to_numpy()
         ys = pd.to_numeric(phase.get("start_y", 0), errors="coerce").fillna(0).to_numpy()
         return np.stack([xs, ys], axis=1)
 
-    def dist_mat(self) -> np.ndarray:
-        seqs = [self.phase_seq(p) for p in self.phases]
-        n = len(seqs)
-        dist = np.zeros((n, n))
-        for i in range(n):
-            for j in range(i + 1, n):
-                d = self.dtw_dist(seqs[i], seqs[j])
-                dist[i, j] = d
-                dist[j, i] = d
-        return dist
-
-    def cluster_map(self, n_clusters: int = 100) -> Dict:
-        if not self.phase_stats:
-            self.feat_list()
-
+    def seq_list(self) -> List[np.ndarray]:
+        # DTW inputs, simplified to at most ``max_points`` points when ``simplify`` is set
+        if self._seqs is None:
+            if isinstance(self.phases, PhaseIndex):
+                coords = self.phases.coords()
+                seqs = [coords[s:e] for s, e in zip(self.phases.starts, self.phases.stops)]
+            else:
+                seqs = [self.phase_seq(p) for p in self.phases]
+            if self.simplify:
+                seqs = simplify_list(seqs, self.simplify, self.max_points, stats=self.dtw_stats)
+            self._seqs = seqs
+        return self._seqs
+
+    def dist_mat(self, seqs: Optional[List[np.ndarray]] = None) -> np.ndarray:
+        seqs = self.seq_list() if seqs is None else seqs
+        # pruned matrices are only exact below the cutoff, so they bypass the store
+        if self.cache and self.cutoff is None:
+            return cached_mat(seqs, self.dtw_mode, self.band, self.workers, self.dtw_stats)
+        return pair_mat(seqs, self.dtw_mode, self.band, self.workers, self.cutoff, self.dtw_stats)
+
+    def tree_cut(self, dist: np.ndarray, n_clusters: int) -> np.ndarray:
+        # 항상 n_clusters개로 자름 - cutoff가 있으면 가지치기된 쌍은 cutoff 초과의 유한한 하한값을 가지므로
+        # cutoff 아래의 병합은 정확하고, 그 위의 병합만 하한값 기준 근사가 된다
+        tree = linkage(squareform(dist), method="complete")
+        return fcluster(tree, t=n_clusters, criterion="maxclust")
+
+    def label_list(self, n_clusters: int) -> np.ndarray:
+        """Cluster label per phase.
+
+        ``exact`` runs complete linkage on the full n x n DTW matrix: O(n^2)
+        DTW runs and memory. ``landmark`` clusters ``landmarks`` evenly spaced
+        phases exactly and gives every phase the label of its nearest landmark:
+        O(L^2 + n*L) DTW runs (most n*L pairs are bound-pruned) and O(L^2 + n)
+        memory, so it scales to thousands of phases per team.
+        """
+        seqs = self.seq_list()
+        if self.cluster_mode != "landmark" or len(seqs) <= self.landmarks:
+            self.marks = np.arange(len(seqs))
+            self.mark_dist = self.dist_mat(seqs)
+            return self.tree_cut(self.mark_dist, n_clusters)
+        self.marks = np.unique(np.linspace(0, len(seqs) - 1, self.landmarks).round().astype(int))
+        mark_seqs = [seqs[i] for i in self.marks]
+        self.mark_dist = self.dist_mat(mark_seqs)
+        mark_labels = self.tree_cut(self.mark_dist, min(n_clusters, len(self.marks)))
+        nearest, _ = proto_near(seqs, mark_seqs, self.dtw_mode, self.band, self.dtw_stats)
+        return mark_labels[nearest]
+
+    def medoid_list(self, labels: np.ndarray) -> Dict[int, int]:
+        # per label, the clustered phase (landmark) with the least total distance to its peers
+        mark_labels = labels[self.marks]
+        medoids: Dict[int, int] = {}
+        for label in np.unique(mark_labels):
+            peers = np.flatnonzero(mark_labels == label)
+            within = self.mark_dist[np.ix_(peers, peers)].sum(axis=1)
+            medoids[int(label)] = int(self.marks[peers[int(np.argmin(within))]])
+        return medoids
+
+    def cluster_map(self, n_clusters: int = 100, labels: Optional[np.ndarray] = None) -> Dict:
         if len(self.phases) <= 1:
             return {}
 
-        n_clusters = min(n_clusters, len(self.phases))
-        dist = self.dist_mat()
-        condensed = squareform(dist)
-        tree = linkage(condensed, method="complete")
-        labels = fcluster(tree, t=n_clusters, criterion="maxclust")
+        if labels is None:
+            labels = self.label_list(min(n_clusters, len(self.phases)))
+        feats = self.feat_mat()
+
+        # clusters in order of first appearance, totals and means as grouped sums
+        uniq, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+        count = np.bincount(inverse, minlength=len(uniq))
+        shots = feats["shot_count"].to_numpy()
+        shot_total = np.bincount(inverse, weights=shots, minlength=len(uniq))
+        shot_phases = np.bincount(inverse, weights=shots > 0, minlength=len(uniq))
+        action_total = np.bincount(inverse, weights=feats["length"].to_numpy(), minlength=len(uniq))
+        sums = np.zeros((len(uniq), len(FEATURE_COLS)))
+        np.add.at(sums, inverse, feats[list(FEATURE_COLS)].to_numpy(dtype=float))
+        means = sums / count[:, None]
+        members = np.split(np.argsort(inverse, kind="stable"), np.cumsum(count)[:-1])
 
         clusters: Dict[int, Dict] = {}
-        for i, label in enumerate(labels):
-            if label not in clusters:
-                clusters[label] = {
-                    "phases": [],
-                    "count": 0,
-                    "shot_phases": 0,
-                    "shot_total": 0,
-                    "action_total": 0,
-                    "avg_features": {},
-                }
-            clusters[label]["phases"].append(i)
-            clusters[label]["count"] += 1
-            shot_count = int(self.phase_stats[i].get("shot_count", 0))
-            action_count = int(self.phase_stats[i].get("length", 0))
-            clusters[label]["shot_total"] += shot_count
-            clusters[label]["action_total"] += action_count
-            if shot_count > 0:
-                clusters[label]["shot_phases"] += 1
-
-        feature_cols = [
-            "length",
-            "duration",
-            "start_x",
-            "start_y",
-            "end_x",
-            "end_y",
-            "avg_x",
-            "avg_y",
-            "pass_count",
-            "carry_count",
-            "forward_progress",
-            "lateral_movement",
-        ]
-        for label in clusters:
-            phase_indices = clusters[label]["phases"]
-            for col in feature_cols:
-                clusters[label]["avg_features"][col] = float(
-                    np.mean([self.phase_stats[i].get(col, 0) for i in phase_indices])
-                )
-            clusters[label]["shot_conversion_rate"] = clusters[label]["shot_total"] / max(
-                clusters[label]["action_total"], 1
-            )
-
+        for c in np.argsort(first, kind="stable"):
+            clusters[uniq[c]] = {
+                "phases": members[c].tolist(),
+                "count": int(count[c]),
+                "shot_phases": int(shot_phases[c]),
+                "shot_total": int(shot_total[c]),
+                "action_total": int(action_total[c]),
+                "avg_features": dict(zip(FEATURE_COLS, means[c].tolist())),
+                "shot_conversion_rate": int(shot_total[c]) / max(int(action_total[c]), 1),
+            }
         return clusters
 
-    def pattern_top(self, n_top: int = 3) -> List[Dict]:
-        clusters = self.cluster_map()
+    def pattern_top(self, n_top: int = 3, clusters: Optional[Dict] = None) -> List[Dict]:
+        clusters = self.cluster_map() if clusters is None else clusters
         if not clusters:
             return []
 
@@ -217,8 +381,8 @@ class PatternMiner(Analyzer):
 
         patterns: List[Dict] = []
         for label, info in sorted_clusters[:n_top]:
-            sequences = [self.phase_code(self.phases[i]) for i in info["phases"]]
-            common = self.seq_freq(sequences)
+            tokens = self.token_list()
+            common = self.seq_freq([tokens[i] for i in info["phases"]])
 
             patterns.append(
                 {
@@ -247,123 +411,425 @@ class PatternMiner(Analyzer):
         return self.pattern_top(self.limit)
 
     def zone_tag(self, x: float, y: float) -> str:
-        x_zone = "수비" if x < 35 else ("중앙" if x < 70 else "공격")
-        y_zone = "좌측" if y < 22.67 else ("중앙" if y < 45.33 else "우측")
-        if x >= 88.5:
-            x_zone = "박스"
-        return f"{x_zone}_{y_zone}"
+        return zone_tag(x, y)
+
+    def token_list(self) -> List[List[int]]:
+        # one tokenization pass over every phase row, split by phase offsets
+        if self._tokens is None:
+            index = self.phase_index()
+            codes, self.vocab, keep = token_codes(index.events)
+            self._tokens = [codes[s:e][keep[s:e]].tolist() for s, e in zip(index.starts, index.stops)]
+        return self._tokens
+
+    def token_text(self, token) -> str:
+        return token if isinstance(token, str) else token_text(token, self.vocab)
+
+    def pattern_weight(self, pattern: Tuple) -> float:
+        if pattern and isinstance(pattern[0], str):
+            return seq_weight(pattern)
+        return sum(SEQ_WEIGHTS.get(self.vocab[int(t) // TOKEN_SPAN], 1.0) for t in pattern)
 
     def phase_code(self, phase: pd.DataFrame) -> List[str]:
-        phase = spadl_map(phase)
-        phase = action_rows(phase)
-        encoded: List[str] = []
-        for _, event in phase.iterrows():
-            action = str(event.get("spadl_type", event.get("type_name", "action")))
-            sx = float(event.get("start_x", 0) or 0)
-            sy = float(event.get("start_y", 0) or 0)
-            ex = float(event.get("end_x", sx) or sx)
-            ey = float(event.get("end_y", sy) or sy)
-            start_zone = self.zone_tag(sx, sy)
-            end_zone = self.zone_tag(ex, ey)
-
-            if action in {"pass", "cross", "corner_crossed", "freekick_crossed", "throw_in", "goal_kick", "dribble"}:
-                token = f"{action} FROM {start_zone} TO {end_zone}"
-            else:
-                token = f"{action} AT {start_zone}"
-            encoded.append(token)
-        return encoded
+        codes, vocab, keep = token_codes(phase)
+        return [token_text(t, vocab) for t in codes[keep]]
 
-    def seq_freq(self, sequences: List[List[str]]) -> List[str]:
+    def seq_freq(self, sequences: List[List]) -> List[str]:
         if not sequences:
             return []
 
         min_support = max(2, int(len(sequences) * 0.1))
-        max_len = 4
-        support_counter: Counter = Counter()
-
-        for seq in sequences:
-            seq_len = len(seq)
-            seen = set()
-            for length in range(2, min(max_len, seq_len) + 1):
-                for idxs in _seq_idx(seq_len, length):
-                    pattern = tuple(seq[i] for i in idxs)
-                    seen.add(pattern)
-            for pattern in seen:
-                support_counter[pattern] += 1
-
         scored = []
-        for pattern, support in support_counter.items():
-            if support < min_support:
-                continue
-            score = support * seq_weight(pattern)
+        for pattern, support in seq_mine(sequences, min_support, max_len=4, max_gap=self.max_gap):
+            score = support * self.pattern_weight(pattern)
             scored.append((score, support, pattern))
 
-        scored.sort(key=lambda x: (x[0], x[1]), reverse=True)
-        return [" -> ".join(pat) for _, _, pat in scored[:10]]
+        # ties are broken by token order so the result does not depend on mining order
+        scored.sort(key=lambda x: (-x[0], -x[1], x[2]))
+        return [" -> ".join(self.token_text(t) for t in pat) for _, _, pat in scored[:10]]
 
 
-def _seq_idx(n: int, length: int) -> Iterable[Tuple[int, ...]]:
-    if length <= 0 or n < length:
-        return []
-    indices = list(range(n))
-    if length == 1:
-        return [(i,) for i in indices]
-    result = []
-
-    def rec(start: int, path: List[int]):
-        if len(path) == length:
-            result.append(tuple(path))
+def seq_mine(
+    sequences: List[List],
+    min_support: int,
+    max_len: int = 4,
+    max_gap: Optional[int] = None,
+) -> List[Tuple[Tuple, int]]:
+    """Frequent subsequences of length 2..max_len with their support (PrefixSpan).
+
+    Each prefix keeps a projected database of end positions per sequence, and
+    only extensions reaching ``min_support`` sequences are grown further.
+    ``max_gap`` bounds the number of skipped items between consecutive pattern
+    items; without it only the earliest end per sequence needs tracking.
+    """
+    found: List[Tuple[Tuple, int]] = []
+
+    def grow(prefix: Tuple, proj: Dict[int, List[int]]) -> None:
+        if len(prefix) >= max_len:
             return
-        for i in range(start, n):
-            rec(i + 1, path + [i])
+        ext: Dict[object, Dict[int, List[int]]] = {}
+        for sid, ends in proj.items():
+            seq = sequences[sid]
+            hits: Dict[object, List[int]] = {}
+            if max_gap is None or not prefix:
+                for pos in range(ends[0] + 1, len(seq)):
+                    if seq[pos] not in hits:
+                        hits[seq[pos]] = [pos]
+                    elif max_gap is not None:
+                        hits[seq[pos]].append(pos)
+            else:
+                reach = set()
+                for end in ends:
+                    reach.update(range(end + 1, min(len(seq), end + max_gap + 2)))
+                for pos in sorted(reach):
+                    hits.setdefault(seq[pos], []).append(pos)
+            for token, positions in hits.items():
+                ext.setdefault(token, {})[sid] = positions
+        for token, sub in ext.items():
+            if len(sub) < min_support:
+                continue
+            pattern = prefix + (token,)
+            if len(pattern) >= 2:
+                found.append((pattern, len(sub)))
+            grow(pattern, sub)
 
-    rec(0, [])
-    return result
+    grow((), {sid: [-1] for sid, seq in enumerate(sequences) if seq})
+    return found
 
 
 def seq_weight(pattern: Tuple[str, ...]) -> float:
-    weights = {
-        "shot": 2.0,
-        "pass": 0.5,
-    }
     score = 0.0
     for token in pattern:
         action = token.split()[0]
-        score += weights.get(action, 1.0)
+        score += SEQ_WEIGHTS.get(action, 1.0)
     return score
 
 
-def team_pat(events_df: pd.DataFrame, team_id: int, n_patterns: int = 3) -> List[Dict]:
+def phase_keys(index: PhaseIndex) -> np.ndarray:
+    # fingerprint per phase from its game, clock and trajectory
+    events = index.events
+    cols = [index.coords()]
+    for col in ("game_id", "time_seconds"):
+        values = events[col] if col in events.columns else pd.Series(0, index=events.index)
+        cols.append(pd.to_numeric(values, errors="coerce").fillna(0).to_numpy(dtype=float)[:, None])
+    rows = np.hstack(cols)
+    return np.array([seq_key(rows[s:e]) for s, e in zip(index.starts, index.stops)], dtype=np.uint64)
+
+
+class PatternState:
+    """Incremental clustering for one team.
+
+    A full fit keeps one medoid prototype per cluster and running totals per
+    cluster. Later calls only assign new phases to their nearest prototype
+    and subtract phases that left the window, until the mean prototype
+    distance of assigned phases drifts past ``DRIFT_LIMIT`` times the fitted
+    radius (or too many phases changed), which triggers a full recluster.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self.members: Dict[int, Tuple[int, np.ndarray]] = {}
+        self.protos: List[np.ndarray] = []
+        self.proto_labels = np.zeros(0, dtype=np.int64)
+        self.totals: Dict[int, Dict] = {}
+        self.radius = 0.0
+        self.drift_sum = 0.0
+        self.drift_n = 0
+        self.stats = {"fits": 0, "updates": 0, "added": 0, "removed": 0, "drift": 0.0}
+
+    def _add(self, key: int, label: int, row: np.ndarray, sign: int = 1) -> None:
+        # ``row`` is one phase_feats row; NaN features are counted apart so removal can undo them
+        total = self.totals.setdefault(label, {
+            "count": 0, "shot_phases": 0,
+            "sums": np.zeros(len(PHASE_FEATURES)), "nans": np.zeros(len(PHASE_FEATURES), dtype=np.int64),
+        })
+        missing = np.isnan(row)
+        total["count"] += sign
+        total["shot_phases"] += sign * int(row[PHASE_FEATURES.index("shot_count")] > 0)
+        total["sums"] += sign * np.where(missing, 0.0, row)
+        total["nans"] += sign * missing
+        if sign > 0:
+            self.members[key] = (label, row)
+        else:
+            self.members.pop(key, None)
+
+    def fit(self, miner: PatternMiner, keys: np.ndarray) -> None:
+        self.members, self.totals = {}, {}
+        self.protos, self.proto_labels = [], np.zeros(0, dtype=np.int64)
+        self.radius, self.drift_sum, self.drift_n = 0.0, 0.0, 0
+        self.stats["fits"] += 1
+        if len(keys) <= 1:
+            return
+        rows = miner.feat_mat().to_numpy(dtype=float)
+        labels = miner.label_list(min(100, len(keys)))
+        for key, label, row in zip(keys.tolist(), labels.tolist(), rows):
+            self._add(key, label, row)
+        seqs = miner.seq_list()
+        medoids = miner.medoid_list(labels)
+        self.proto_labels = np.array(list(medoids.keys()), dtype=np.int64)
+        self.protos = [seqs[i] for i in medoids.values()]
+        _, best = proto_near(seqs, self.protos, miner.dtw_mode, miner.band, miner.dtw_stats)
+        # 메도이드 자신(거리 0)은 빼고 기준 반경 계산 - 새 Phase는 메도이드가 될 수 없음
+        others = np.ones(len(seqs), dtype=bool)
+        others[list(medoids.values())] = False
+        self.radius = float(best[others].mean()) if others.any() else 0.0
+
+    def update(self, miner: PatternMiner, keys: np.ndarray) -> bool:
+        # False when the caller should refit instead
+        current = set(keys.tolist())
+        fresh = [i for i, key in enumerate(keys.tolist()) if key not in self.members]
+        gone = [key for key in self.members if key not in current]
+        if not self.protos or max(len(fresh), len(gone)) > TURNOVER_LIMIT * len(self.members):
+            return False
+        nearest: np.ndarray = np.zeros(0, dtype=np.int64)
+        if fresh:
+            seqs = miner.seq_list()
+            nearest, best = proto_near([seqs[i] for i in fresh], self.protos, miner.dtw_mode, miner.band, miner.dtw_stats)
+            drift_sum, drift_n = self.drift_sum + float(best.sum()), self.drift_n + len(fresh)
+            drift = (drift_sum / drift_n) / self.radius if self.radius > 0 else (0.0 if drift_sum == 0 else np.inf)
+            if drift > DRIFT_LIMIT:
+                return False
+            self.drift_sum, self.drift_n, self.stats["drift"] = drift_sum, drift_n, round(float(drift), 3)
+        for key in gone:
+            label, row = self.members[key]
+            self._add(key, label, row, -1)
+        rows = miner.feat_mat().to_numpy(dtype=float) if fresh else None
+        for i, near in zip(fresh, nearest.tolist()):
+            self._add(int(keys[i]), int(self.proto_labels[near]), rows[i])
+        self.stats["updates"] += 1
+        self.stats["added"] += len(fresh)
+        self.stats["removed"] += len(gone)
+        return True
+
+    def clusters(self, keys: np.ndarray) -> Dict:
+        # cluster_map layout with "phases" as positions in the current phase list
+        clusters: Dict[int, Dict] = {}
+        for i, key in enumerate(keys.tolist()):
+            label = self.members[key][0]
+            if label not in clusters:
+                total = self.totals[label]
+                means = np.where(total["nans"] > 0, np.nan, total["sums"] / max(total["count"], 1))
+                feats = dict(zip(PHASE_FEATURES, means.tolist()))
+                shot_total = int(round(total["sums"][PHASE_FEATURES.index("shot_count")]))
+                action_total = int(round(total["sums"][PHASE_FEATURES.index("length")]))
+                clusters[label] = {
+                    "phases": [],
+                    "count": total["count"],
+                    "shot_phases": total["shot_phases"],
+                    "shot_total": shot_total,
+                    "action_total": action_total,
+                    "avg_features": {col: feats[col] for col in FEATURE_COLS},
+                    "shot_conversion_rate": shot_total / max(action_total, 1),
+                }
+            clusters[label]["phases"].append(i)
+        return clusters
+
+    def data(self, miner: PatternMiner) -> List[Dict]:
+        keys = phase_keys(miner.phases)
+        with self._lock:
+            if not self.update(miner, keys):
+                self.fit(miner, keys)
+            clusters = self.clusters(keys) if self.members else {}
+        return miner.pattern_top(miner.limit, clusters)
+
+
+# (team_id, n_games, dtw_mode, band, cutoff) -> [마지막 사용 세대, 상태]
+_states: "OrderedDict[Tuple, List]" = OrderedDict()
+_state_marks: List[tuple] = []
+_states_lock = Lock()
+
+
+def pattern_state(
+    team_id: int,
+    n_games: int,
+    dtw_mode: str = "fast",
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None,
+) -> PatternState:
+    """Incremental state for one team, game window and DTW setting.
+
+    At most ``STATE_MAX`` states are kept (least recently used dropped
+    first). States not used in the current or previous data generation are
+    dropped when the generation changes; the previous one is kept because
+    the next round updates it from the new games.
+    """
+    # 같은 창의 요청만 각 상태의 잠금으로 직렬화
+    mark = data_stamp()
+    key = (int(team_id), int(n_games), dtw_mode, band, cutoff)
+    with _states_lock:
+        if not _state_marks or _state_marks[-1] != mark:
+            _state_marks[:] = _state_marks[-1:] + [mark]
+            for old in [k for k, (used, _) in _states.items() if used not in _state_marks]:
+                del _states[old]
+        if key not in _states:
+            _states[key] = [mark, PatternState()]
+        entry = _states[key]
+        entry[0] = mark
+        _states.move_to_end(key)
+        while len(_states) > STATE_MAX:
+            _states.popitem(last=False)
+        return entry[1]
+
+
+def team_pat(
+    events_df: pd.DataFrame,
+    team_id: int,
+    n_patterns: int = 3,
+    cluster_mode: str = "exact",
+    dtw_mode: str = "fast",
+    band: Optional[int] = None,
+    n_games: Optional[int] = None,
+    cutoff: Optional[float] = None,
+    stats: Optional[Dict] = None,
+) -> List[Dict]:
+    """Top attacking patterns of ``team_id``.
+
+    ``cutoff`` turns on lower-bound pruning of DTW pairs farther apart than
+    it; the cluster count is unchanged, only merges above the cutoff become
+    approximate. DTW counters (pairs, pruned, prune_rate, ...) are added to
+    ``stats`` when given.
+    """
     events_df = action_rows(events_df)
-    analyzer = PhaseAnalyzer(events_df)
-    phases = analyzer.phase_list()
-    if not phases:
+    index = PhaseAnalyzer(events_df).phase_index()
+    if not len(index):
         return []
 
     # Keep phases that start with the team of interest.
-    team_phases = [p for p in phases if int(p.iloc[0].get("team_id", -1)) == int(team_id)]
-    if not team_phases:
+    team_phases = index.take(index.lead("team_id") == int(team_id))
+    if not len(team_phases):
         return []
 
-    # cap phases to keep DTW cost bounded
+    # exact mode caps phases to keep DTW cost bounded; landmark/incremental modes keep them all
     max_phases = 200
-    if len(team_phases) > max_phases:
-        shot_idx = [
-            i
-            for i, p in enumerate(team_phases)
-            if "type_name" in p.columns and (p["type_name"] == "Shot").any()
-        ]
-        keep = shot_idx
-        if len(keep) > max_phases:
-            keep = sorted(keep, key=lambda i: len(team_phases[i]), reverse=True)[:max_phases]
-        else:
-            extra = max_phases - len(keep)
-            if extra > 0:
-                other = [i for i in range(len(team_phases)) if i not in set(keep)]
-                other = sorted(other, key=lambda i: len(team_phases[i]), reverse=True)[:extra]
-                keep = keep + other
-        keep = sorted(set(keep))
-        team_phases = [team_phases[i] for i in keep]
-
-    miner = PatternMiner(team_phases, n_patterns)
-    return miner.data()
+    if cluster_mode == "exact" and len(team_phases) > max_phases:
+        lengths = team_phases.lengths()
+        by_length = np.argsort(-lengths, kind="stable")
+        shots = team_phases.any_of(team_phases.events["type_name"].to_numpy() == "Shot") \
+            if "type_name" in team_phases.events.columns else np.zeros(len(team_phases), dtype=bool)
+        keep = by_length[shots[by_length]][:max_phases]
+        extra = max_phases - len(keep)
+        if extra > 0:
+            keep = np.concatenate([keep, by_length[~shots[by_length]][:extra]])
+        team_phases = team_phases.take(np.sort(keep))
+
+    if cluster_mode == "incremental":
+        miner = PatternMiner(
+            team_phases, n_patterns, dtw_mode=dtw_mode, band=band, cutoff=cutoff,
+            cluster_mode="landmark", landmarks=max_phases
+        )
+        if n_games is None:
+            n_games = int(events_df["game_id"].nunique())
+        patterns = pattern_state(team_id, n_games, dtw_mode, band, cutoff).data(miner)
+    else:
+        miner = PatternMiner(
+            team_phases, n_patterns, dtw_mode=dtw_mode, band=band, cutoff=cutoff,
+            cluster_mode=cluster_mode, landmarks=max_phases
+        )
+        patterns = miner.data()
+    if stats is not None:
+        stats.update(miner.dtw_stats)
+    return patterns
+
+
+# /api/patterns 결과 캐시 (데이터 세대별, 동일 요청은 한 번만 계산)
+PATTERN_CACHE = FlightCache(maxsize=256)
+
+
+def pat_box(
+    team_id: int,
+    n_games: int,
+    n_patterns: int,
+    mark: tuple,
+    cluster_mode: str = "exact",
+    dtw_mode: str = "fast",
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None,
+) -> Dict:
+    def load() -> Dict:
+        events = match_events(team_id, n_games, include_opponent=True, normalize_mode="team")
+        if len(events) == 0:
+            return {}
+        stats: Dict = {}
+        patterns = team_pat(events, team_id, n_patterns, cluster_mode, dtw_mode, band, n_games, cutoff, stats)
+        return {"total_events": len(events), "patterns": patterns, "dtw_stats": stats}
+
+    key = (int(team_id), int(n_games), int(n_patterns), cluster_mode, dtw_mode, band, cutoff)
+    return PATTERN_CACHE.get(mark, key, load)
+
+
+def pat_warm(n_games: int = 5, n_patterns: int = 3) -> Dict:
+    # fill the cache for every team with the endpoint defaults
+    mark = data_stamp()
+    done, failed = 0, 0
+    for team in teams():
+        try:
+            pat_box(int(team["team_id"]), n_games, n_patterns, mark)
+            done += 1
+        except Exception:
+            failed += 1
+    return {"teams": done, "failed": failed}
+
+
+@lru_cache(maxsize=2)
+def _phase_embed(mark: tuple) -> Tuple[EmbedIndex, np.ndarray]:
+    # embedding index plus the store's coordinate array (for DTW re-rank)
+    index = phase_store().index
+    coords = index.coords()
+    offsets = np.concatenate([[0], np.cumsum(index.lengths())])
+    rows = np.flatnonzero(index.phase_id >= 0)
+    vectors = resample(coords[rows], offsets, EMBED_POINTS)
+    return EmbedIndex(vectors.reshape(len(index), -1)), coords
+
+
+def phase_embed() -> Tuple[EmbedIndex, np.ndarray]:
+    return _phase_embed(data_stamp())
+
+
+def similar_phases(
+    phase_id: int,
+    k: int = 10,
+    rerank: bool = True,
+    pool: int = 50,
+    other_teams: bool = False,
+) -> Optional[Dict]:
+    """League phases most similar to ``phase_id``.
+
+    Candidates come from the embedding index (resampled trajectories, brute
+    force kNN); with ``rerank`` only the top ``pool`` are re-ordered by DTW.
+    ``pool`` is clamped to ``[k, SIMILAR_POOL_MAX]``. Returns None for an
+    unknown phase id.
+    """
+    pool = min(max(int(pool), k), max(SIMILAR_POOL_MAX, k))
+    store = phase_store()
+    row = store.item(phase_id)
+    if row is None:
+        return None
+    table = store.table
+    pos = table.index.get_loc(int(phase_id))
+    skip = np.flatnonzero(table["team_id"].to_numpy() == row["team_id"]) if other_teams else np.array([pos])
+    skip = np.union1d(skip, [pos])
+
+    embed, coords = phase_embed()
+    near, dist = embed.knn(embed.vectors[pos], pool if rerank else k, skip)
+    method = "embedding"
+    if rerank and len(near):
+        starts, stops = store.index.starts, store.index.stops
+        seqs = [coords[starts[i]:stops[i]] for i in near]
+        ranked = dtw_knn(coords[starts[pos]:stops[pos]], seqs, k)
+        near = near[[i for i, _ in ranked]]
+        dist = np.array([d for _, d in ranked])
+        method = "dtw"
+
+    results = []
+    for i, d in zip(near[:k], dist[:k]):
+        hit = table.iloc[int(i)]
+        results.append({
+            "phase_id": int(hit["phase_id"]), "game_id": int(hit["game_id"]), "team_id": int(hit["team_id"]),
+            "distance": round(float(d), 2), "length": int(hit["length"]),
+            "has_shot": bool(hit["shot_count"] > 0),
+            "start_zone": zone_tag(hit["start_x"], hit["start_y"]),
+            "event_sequence": hit["event_sequence"][:100],
+        })
+    return {
+        "phase_id": int(phase_id), "team_id": int(row["team_id"]), "game_id": int(row["game_id"]),
+        "method": method, "similar": results,
+    }
@@ -0,0 +1,114 @@
+# 결과 캐시 - 데이터 세대(data_stamp) 단위 무효화와 동일 요청 단일 계산(single-flight)
+from __future__ import annotations
+
+from collections import OrderedDict
+from concurrent.futures import Future
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class FlightCache:
+    """LRU result cache for one data generation with single-flight loading.
+
+    Entries belong to the generation ``mark`` they were computed for; the
+    first call with a new mark drops everything older. Concurrent calls for
+    a key that is still computing wait on the same future instead of
+    recomputing, and failures are passed to every waiter but never cached.
+    """
+
+    def __init__(self, maxsize: int = 256) -> None:
+        self._lock = Lock()
+        self.maxsize = maxsize
+        self.mark: Optional[tuple] = None
+        self.items: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self.flights: Dict[Hashable, Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "joins": 0}
+
+    def _renew(self, mark: tuple) -> None:
+        if mark != self.mark:
+            self.mark = mark
+            self.items.clear()
+            self.flights.clear()
+
+    def get(self, mark: tuple, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self._renew(mark)
+            if key in self.items:
+                self.items.move_to_end(key)
+                self.stats["hits"] += 1
+                return self.items[key]
+            flight = self.flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self.flights[key] = Future()
+                self.stats["misses"] += 1
+            else:
+                self.stats["joins"] += 1
+        if not owner:
+            return flight.result()
+
+        try:
+            value = fn()
+        except BaseException as e:
+            with self._lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+            flight.set_exception(e)
+            raise
+        with self._lock:
+            if self.mark == mark and self.flights.get(key) is flight:
+                del self.flights[key]
+                self.items[key] = value
+                while len(self.items) > self.maxsize:
+                    self.items.popitem(last=False)
+        flight.set_result(value)
+        return value
+
+    def attach(self, mark: tuple, key: Hashable, future: Future) -> bool:
+        """Register work already running elsewhere (e.g. a process pool) as the key's flight.
+
+        Callers of ``get`` for the key wait on ``future`` and its result is
+        cached when it finishes. Returns False when the key is already cached
+        or computing for this generation.
+        """
+        with self._lock:
+            self._renew(mark)
+            if key in self.items or key in self.flights:
+                return False
+            flight = self.flights[key] = Future()
+
+        def done(work: Future) -> None:
+            error = work.exception()
+            with self._lock:
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+                    if error is None and self.mark == mark:
+                        self.items[key] = work.result()
+                        while len(self.items) > self.maxsize:
+                            self.items.popitem(last=False)
+            if error is None:
+                flight.set_result(work.result())
+            else:
+                flight.set_exception(error)
+
+        future.add_done_callback(done)
+        return True
+
+    def peek(self, mark: tuple, key: Hashable) -> Optional[Any]:
+        # cached value for this generation without computing, None on a miss
+        with self._lock:
+            if self.mark != mark or key not in self.items:
+                return None
+            self.items.move_to_end(key)
+            self.stats["hits"] += 1
+            return self.items[key]
+
+    def pending(self, mark: tuple, key: Hashable) -> bool:
+        # True when the key is cached or being computed for this generation
+        with self._lock:
+            return self.mark == mark and (key in self.items or key in self.flights)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.items.clear()
+            self.flights.clear()
@@ -40,8 +40,7 @@ def _matches(mark: tuple) -> pd.DataFrame:
 def matches() -> pd.DataFrame:
     return _matches(data_stamp())
 
-def team_events(team_id: int, n_games: int = 5) -> pd.DataFrame:
-    events = raw()
+def recent_games(team_id: int, n_games: int = 5) -> list:
     match_df = matches()
     
     team_matches = match_df[
@@ -49,7 +48,11 @@ def team_events(team_id: int, n_games: int = 5) -> pd.DataFrame:
         (match_df['away_team_id'] == team_id)
     ].sort_values('game_date', ascending=False)
     
-    recent_matches = team_matches.head(n_games)['game_id'].tolist()
+    return team_matches.head(n_games)['game_id'].tolist()
+
+def team_events(team_id: int, n_games: int = 5) -> pd.DataFrame:
+    events = raw()
+    recent_matches = recent_games(team_id, n_games)
     
     team_events = events[
         (events['game_id'].isin(recent_matches)) & 
@@ -67,11 +70,7 @@ def match_events(
 ) -> pd.DataFrame:
     events = raw()
     match_df = matches()
-
-    team_matches = match_df[
-        (match_df["home_team_id"] == team_id) | (match_df["away_team_id"] == team_id)
-    ].sort_values("game_date", ascending=False)
-    recent_matches = team_matches.head(n_games)["game_id"].tolist()
+    recent_matches = recent_games(team_id, n_games)
 
     match_events = events[events["game_id"].isin(recent_matches)].copy()
     if not include_opponent:
@@ -0,0 +1,241 @@
+# Phase 분할 엔진 - 벡터화된 경계 계산과 (start, stop) 오프셋 인덱스
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .data import raw, matches, data_stamp
+from .spadl import action_rows, flip_rows
+
+PHASE_ORDER = ["game_id", "period_id", "time_seconds", "action_id"]
+PHASE_GAP_SECONDS = 10
+MIN_PHASE_EVENTS = 3
+# 안정 Phase ID = game_id * PHASE_ID_BASE + 경기 내 순번
+PHASE_ID_BASE = 10000
+
+
+@dataclass
+class PhaseIndex:
+    """Phases as row offsets into one sorted event frame.
+
+    ``events`` is sorted by ``PHASE_ORDER`` with a fresh RangeIndex, phase ``k``
+    covers ``events.iloc[starts[k]:stops[k]]`` and ``phase_id`` labels every row
+    with its phase position (-1 for rows outside any phase).
+    """
+
+    events: pd.DataFrame
+    phase_id: np.ndarray
+    starts: np.ndarray
+    stops: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def __getitem__(self, i: int) -> pd.DataFrame:
+        return self.events.iloc[int(self.starts[i]):int(self.stops[i])]
+
+    def __iter__(self) -> Iterator[pd.DataFrame]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def lengths(self) -> np.ndarray:
+        return self.stops - self.starts
+
+    def lead(self, col: str, default: float = -1) -> np.ndarray:
+        if col not in self.events.columns or len(self) == 0:
+            return np.full(len(self), default, dtype=float)
+        values = pd.to_numeric(self.events[col], errors="coerce").fillna(default).to_numpy(dtype=float)
+        return values[self.starts]
+
+    def any_of(self, mask: np.ndarray) -> np.ndarray:
+        if len(self) == 0:
+            return np.zeros(0, dtype=bool)
+        hits = np.concatenate([[0], np.cumsum(np.asarray(mask, dtype=np.int64))])
+        return (hits[self.stops] - hits[self.starts]) > 0
+
+    def reduce(self, ufunc: np.ufunc, values: np.ndarray) -> np.ndarray:
+        # ufunc over each [start, stop) segment; phases are never empty
+        if len(self) == 0:
+            return np.zeros(0, dtype=np.asarray(values).dtype)
+        values = np.asarray(values)
+        if values.dtype == bool:
+            values = values.astype(np.int64)
+        padded = np.concatenate([values, values[:1]])
+        return ufunc.reduceat(padded, np.column_stack([self.starts, self.stops]).ravel())[::2]
+
+    def coords(self, x_col: str = "start_x", y_col: str = "start_y") -> np.ndarray:
+        xs = pd.to_numeric(self.events[x_col], errors="coerce").fillna(0).to_numpy(dtype=float)
+        ys = pd.to_numeric(self.events[y_col], errors="coerce").fillna(0).to_numpy(dtype=float)
+        return np.stack([xs, ys], axis=1)
+
+    def take(self, keep: np.ndarray) -> "PhaseIndex":
+        keep = np.asarray(keep)
+        if keep.dtype == bool:
+            keep = np.flatnonzero(keep)
+        starts = self.starts[keep]
+        stops = self.stops[keep]
+        return PhaseIndex(self.events, phase_rows(len(self.events), starts, stops), starts, stops)
+
+
+def phase_rows(n_rows: int, starts: np.ndarray, stops: np.ndarray) -> np.ndarray:
+    phase_id = np.full(n_rows, -1, dtype=np.int64)
+    if len(starts):
+        lengths = stops - starts
+        rows = np.repeat(stops - np.cumsum(lengths), lengths) + np.arange(int(lengths.sum()))
+        phase_id[rows] = np.repeat(np.arange(len(starts)), lengths)
+    return phase_id
+
+
+def _col(events: pd.DataFrame, col: str) -> np.ndarray:
+    if col not in events.columns:
+        return np.zeros(len(events))
+    return events[col].to_numpy()
+
+
+def phase_bounds(events: pd.DataFrame, gap: float, min_events: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Phase (start, stop) offsets for events already sorted by ``PHASE_ORDER``.
+
+    A break is any time gap above ``gap`` or a team/period change between
+    consecutive rows. Breaks only close a phase once it holds ``min_events``
+    rows; shorter runs carry into the next phase and are dropped at game end.
+    """
+    n = len(events)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    game = events["game_id"].to_numpy()
+    times = pd.to_numeric(events["time_seconds"], errors="coerce").to_numpy(dtype=float) \
+        if "time_seconds" in events.columns else np.zeros(n)
+    team = _col(events, "team_id")
+    period = _col(events, "period_id")
+
+    fresh = np.ones(n, dtype=bool)
+    fresh[1:] = game[1:] != game[:-1]
+    cut = fresh.copy()
+    with np.errstate(invalid="ignore"):
+        cut[1:] |= np.diff(times) > gap
+    cut[1:] |= team[1:] != team[:-1]
+    cut[1:] |= period[1:] != period[:-1]
+
+    # Only the segment boundaries need a sequential pass (short runs merge forward)
+    starts: List[int] = []
+    stops: List[int] = []
+    open_at = 0
+    for pos, new_game in zip(np.flatnonzero(cut).tolist(), fresh[cut].tolist()):
+        if pos - open_at >= min_events or (new_game and pos > 0):
+            if pos - open_at >= min_events:
+                starts.append(open_at)
+                stops.append(pos)
+            open_at = pos
+    if n - open_at >= min_events:
+        starts.append(open_at)
+        stops.append(n)
+    return np.asarray(starts, dtype=np.int64), np.asarray(stops, dtype=np.int64)
+
+
+def phase_index(events: pd.DataFrame, gap: float, min_events: int) -> PhaseIndex:
+    order = [col for col in PHASE_ORDER if col in events.columns]
+    events = events.sort_values(order).reset_index(drop=True)
+    starts, stops = phase_bounds(events, gap, min_events)
+    return PhaseIndex(events, phase_rows(len(events), starts, stops), starts, stops)
+
+
+def phase_summary(index: PhaseIndex) -> pd.DataFrame:
+    # Per-phase summary columns in one pass over the offsets
+    events = index.events
+    first = index.starts
+    last = index.stops - 1
+
+    def num(col: str) -> np.ndarray:
+        if col not in events.columns:
+            return np.zeros(len(events))
+        return pd.to_numeric(events[col], errors="coerce").to_numpy(dtype=float)
+
+    types = events["type_name"].astype(str).to_numpy() if "type_name" in events.columns else np.full(len(events), "")
+    times = num("time_seconds")
+    type_list = types.tolist()
+    return pd.DataFrame({
+        "game_id": pd.to_numeric(events["game_id"], errors="coerce").to_numpy()[first],
+        "team_id": index.lead("team_id"),
+        "period_id": num("period_id")[first],
+        "start": first,
+        "stop": index.stops,
+        "length": index.lengths(),
+        "duration": index.reduce(np.fmax, times) - index.reduce(np.fmin, times),
+        "start_x": num("start_x")[first],
+        "start_y": num("start_y")[first],
+        "end_x": num("end_x")[last],
+        "end_y": num("end_y")[last],
+        "pass_count": index.reduce(np.add, types == "Pass"),
+        "shot_count": index.reduce(np.add, types == "Shot"),
+        "event_sequence": ["_".join(type_list[a:b]) for a, b in zip(first, index.stops)],
+    })
+
+
+@dataclass
+class PhaseStore:
+    """League-wide phases for one data generation.
+
+    ``index.events`` holds every event with coordinates flipped to the
+    attacking direction of the team that owns each phase (``team_norm``
+    semantics), and ``table`` is keyed by stable ``phase_id``.
+    """
+
+    index: PhaseIndex
+    table: pd.DataFrame
+
+    def item(self, phase_id: int) -> Optional[pd.Series]:
+        try:
+            return self.table.loc[int(phase_id)]
+        except KeyError:
+            return None
+
+    def frame(self, phase_id: int) -> Optional[pd.DataFrame]:
+        row = self.item(phase_id)
+        if row is None:
+            return None
+        return self.index.events.iloc[int(row["start"]):int(row["stop"])]
+
+    def team_table(self, team_id: int, game_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        rows = self.table[self.table["team_id"] == int(team_id)]
+        if game_ids is not None:
+            rows = rows[rows["game_id"].isin(game_ids)]
+        return rows
+
+
+@lru_cache(maxsize=4)
+def _phase_store(mark: tuple, actions: bool) -> PhaseStore:
+    # actions=True: /api/patterns/{team_id}와 같이 SPADL 행동(action_rows)만으로 분할
+    events = raw()
+    index = phase_index(action_rows(events) if actions else events, PHASE_GAP_SECONDS, MIN_PHASE_EVENTS)
+    events = index.events.copy()
+    inside = index.phase_id >= 0
+    row_team = np.full(len(events), -1.0)
+    row_team[inside] = index.lead("team_id")[index.phase_id[inside]]
+    away = matches().set_index("game_id")["away_team_id"]
+    away_team = pd.to_numeric(events["game_id"].map(away), errors="coerce").to_numpy(dtype=float)
+    flip = inside & (row_team == away_team)
+    if flip.any():
+        events = flip_rows(events, flip)
+    index = PhaseIndex(events, index.phase_id, index.starts, index.stops)
+
+    table = phase_summary(index)
+    game = table["game_id"].to_numpy()
+    new_game = np.r_[True, game[1:] != game[:-1]] if len(game) else np.zeros(0, dtype=bool)
+    ordinal = np.arange(len(game)) - np.maximum.accumulate(np.where(new_game, np.arange(len(game)), 0))
+    table.insert(0, "phase_id", (game.astype(np.int64) * PHASE_ID_BASE + ordinal).astype(np.int64))
+    return PhaseStore(index, table.set_index("phase_id", drop=False))
+
+
+def phase_store(actions: bool = False) -> PhaseStore:
+    """League phase store for the current data generation.
+
+    The default store is segmented on every raw event (Pass Received, Out,
+    ...); ``actions=True`` segments only SPADL actions like the team pattern
+    endpoint, so its phase ids differ from the default store's.
+    """
+    return _phase_store(data_stamp(), bool(actions))
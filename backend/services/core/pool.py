@@ -0,0 +1,33 @@
+# 공유 프로세스 풀 - DTW 타일, 리그 배치, 네트워크 워밍업이 함께 사용
+from __future__ import annotations
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import Dict
+
+# 워커 수 (미설정이면 CPU 코어 수, DTW_WORKERS로 줄일 수 있음)
+POOL_WORKERS = int(os.getenv("DTW_WORKERS", "0") or 0) or os.cpu_count() or 1
+# 워커 시작 방식 - 스레드가 도는 서버 프로세스를 fork하지 않도록 spawn/forkserver만 허용
+POOL_START = os.getenv("POOL_START", "spawn")
+
+_pools: Dict[int, ProcessPoolExecutor] = {}
+_pool_lock = Lock()
+
+
+def process_pool(workers: int = POOL_WORKERS) -> ProcessPoolExecutor:
+    """Process pool shared by every caller asking for the same worker count.
+
+    Workers start with ``spawn`` (or ``forkserver``), never ``fork``, because
+    the warm-up threads submit work while other threads are running. A pool
+    broken by a crashed worker is replaced on the next call.
+    """
+    if POOL_START not in ("spawn", "forkserver"):
+        raise ValueError("POOL_START must be 'spawn' or 'forkserver'")
+    with _pool_lock:
+        # 워커가 비정상 종료되어 깨진 풀은 새로 만든다
+        if workers not in _pools or getattr(_pools[workers], "_broken", False):
+            context = multiprocessing.get_context(POOL_START)
+            _pools[workers] = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+        return _pools[workers]
@@ -85,6 +85,10 @@ def team_norm(
     if not mask.any():
         return events
 
+    return flip_rows(events, mask)
+
+# Pitch flip for masked rows (in place)
+def flip_rows(events: pd.DataFrame, mask) -> pd.DataFrame:
     for col in ("start_x", "end_x"):
         if col in events.columns:
             events.loc[mask, col] = PITCH_LENGTH - events.loc[mask, col].astype(float)
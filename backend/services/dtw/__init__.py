@@ -0,0 +1 @@
+# dtw 패키지 - DTW 거리 커널, 거리 행렬, 하한 및 캐시
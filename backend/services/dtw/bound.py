@@ -0,0 +1,129 @@
+# DTW 하한 - LB_Kim / LB_Keogh 와 하한 기반 가지치기 최근접 탐색
+from __future__ import annotations
+
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .kernel import band_width, dtw_dist
+
+
+def lb_kim(seq_a: np.ndarray, seq_b: np.ndarray) -> float:
+    # First and last cells lie on every warping path (the same cell when both have one point)
+    if len(seq_a) == 0 or len(seq_b) == 0:
+        return 0.0
+    first = float(np.linalg.norm(seq_a[0] - seq_b[0]))
+    if len(seq_a) == 1 and len(seq_b) == 1:
+        return first
+    return first + float(np.linalg.norm(seq_a[-1] - seq_b[-1]))
+
+
+def box_dist(points: np.ndarray, lower: np.ndarray, upper: np.ndarray) -> np.ndarray:
+    gap = np.maximum(np.maximum(lower - points, points - upper), 0.0)
+    return np.sqrt(np.sum(gap * gap, axis=-1))
+
+
+def lb_keogh(seq_a: np.ndarray, seq_b: np.ndarray, band: Optional[int] = None) -> float:
+    """Sum over ``seq_a`` of each point's distance to the envelope of ``seq_b``.
+
+    Every point of ``seq_a`` is matched at least once inside its band window,
+    so the distance to that window's bounding box never exceeds its DTW cost.
+    """
+    n, m = len(seq_a), len(seq_b)
+    if n == 0 or m == 0:
+        return 0.0
+    width = band_width(n, m, band)
+    if width >= m:
+        return float(box_dist(seq_a, seq_b.min(axis=0), seq_b.max(axis=0)).sum())
+    pad = ((width, width + max(0, n - m)), (0, 0))
+    lower = np.lib.stride_tricks.sliding_window_view(
+        np.pad(seq_b, pad, constant_values=np.inf), 2 * width + 1, axis=0
+    )[:n].min(axis=-1)
+    upper = np.lib.stride_tricks.sliding_window_view(
+        np.pad(seq_b, pad, constant_values=-np.inf), 2 * width + 1, axis=0
+    )[:n].max(axis=-1)
+    return float(box_dist(seq_a, lower, upper).sum())
+
+
+def lb_pair(seq_a: np.ndarray, seq_b: np.ndarray, band: Optional[int] = None) -> float:
+    return max(lb_kim(seq_a, seq_b), lb_keogh(seq_a, seq_b, band), lb_keogh(seq_b, seq_a, band))
+
+
+def _seq_ends(coords: np.ndarray, offsets: np.ndarray, span: Tuple[int, int]) -> np.ndarray:
+    # first point, last point, box lower, box upper per sequence
+    ends = np.zeros((4, span[1] - span[0], coords.shape[1]))
+    for pos, i in enumerate(range(span[0], span[1])):
+        seq = coords[offsets[i]:offsets[i + 1]]
+        if len(seq):
+            ends[:, pos] = seq[0], seq[-1], seq.min(axis=0), seq.max(axis=0)
+    return ends
+
+
+def _keogh_block(
+    coords: np.ndarray, offsets: np.ndarray, span: Tuple[int, int], lower: np.ndarray, upper: np.ndarray
+) -> np.ndarray:
+    points = coords[offsets[span[0]]:offsets[span[1]]]
+    cost = box_dist(points[:, None, :], lower[None, :, :], upper[None, :, :])
+    acc = np.vstack([np.zeros((1, cost.shape[1])), np.cumsum(cost, axis=0)])
+    rel = offsets[span[0]:span[1] + 1] - offsets[span[0]]
+    return acc[rel[1:]] - acc[rel[:-1]]
+
+
+def lb_block(
+    coords: np.ndarray, offsets: np.ndarray, rows: Tuple[int, int], cols: Tuple[int, int]
+) -> np.ndarray:
+    """Unbanded ``max(LB_Kim, LB_Keogh(a, b), LB_Keogh(b, a))`` for one tile.
+
+    Banded DTW is never below unbanded DTW, so the bound holds for any band.
+    """
+    first_r, last_r, lower_r, upper_r = _seq_ends(coords, offsets, rows)
+    first_c, last_c, lower_c, upper_c = _seq_ends(coords, offsets, cols)
+    first = np.linalg.norm(first_r[:, None, :] - first_c[None, :, :], axis=-1)
+    last = np.linalg.norm(last_r[:, None, :] - last_c[None, :, :], axis=-1)
+    size_r = np.diff(offsets[rows[0]:rows[1] + 1])
+    size_c = np.diff(offsets[cols[0]:cols[1] + 1])
+    single = (size_r[:, None] == 1) & (size_c[None, :] == 1)
+    kim = np.where(single, first, first + last)
+    keogh_a = _keogh_block(coords, offsets, rows, lower_c, upper_c)
+    keogh_b = _keogh_block(coords, offsets, cols, lower_r, upper_r).T
+    return np.maximum(kim, np.maximum(keogh_a, keogh_b))
+
+
+def dtw_knn(
+    query: np.ndarray,
+    seqs: Sequence[np.ndarray],
+    k: int = 1,
+    mode: str = "fast",
+    band: Optional[int] = None,
+    stats: Optional[Dict] = None,
+) -> List[Tuple[int, float]]:
+    """k nearest ``seqs`` to ``query`` by DTW, visiting candidates in bound order.
+
+    Full DTW runs only while a candidate's lower bound is below the current
+    k-th best distance, which also serves as the early-abandon cutoff.
+    """
+    bounds = np.array([lb_pair(query, seq, band) for seq in seqs])
+    best: List[Tuple[float, int]] = []
+    computed = 0
+    for idx in np.argsort(bounds, kind="stable"):
+        cutoff = -best[0][0] if len(best) == k else np.inf
+        if bounds[idx] > cutoff:
+            break
+        computed += 1
+        dist = dtw_dist(query, seqs[idx], mode, band, cutoff)
+        if dist <= cutoff:
+            heapq.heappush(best, (-dist, int(idx)))
+            if len(best) > k:
+                heapq.heappop(best)
+    if stats is not None:
+        stat_add(stats, pairs=len(seqs), pruned=len(seqs) - computed)
+    return sorted(((idx, -neg) for neg, idx in best), key=lambda x: x[1])
+
+
+def stat_add(stats: Dict, pairs: int = 0, pruned: int = 0, abandoned: int = 0) -> Dict:
+    stats["pairs"] = stats.get("pairs", 0) + pairs
+    stats["pruned"] = stats.get("pruned", 0) + pruned
+    stats["abandoned"] = stats.get("abandoned", 0) + abandoned
+    stats["prune_rate"] = stats["pruned"] / max(stats["pairs"], 1)
+    return stats
@@ -0,0 +1,80 @@
+# 궤적 임베딩 - 호 길이 기준 고정 길이 재표본화와 BLAS 전수 kNN 인덱스
+from __future__ import annotations
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+# 재표본화 점 개수 (임베딩 차원 = EMBED_POINTS * 2)
+EMBED_POINTS = 16
+
+
+def resample(coords: np.ndarray, offsets: np.ndarray, points: int = EMBED_POINTS) -> np.ndarray:
+    """Every packed sequence resampled to ``points`` evenly spaced arc-length positions.
+
+    Sequences that never move fall back to even spacing by row, and one-row
+    sequences repeat their single point. Returns ``(n_seqs, points, dims)``.
+    """
+    n = len(offsets) - 1
+    dims = coords.shape[1] if coords.ndim == 2 else 2
+    out = np.zeros((n, points, dims))
+    if n == 0 or len(coords) == 0:
+        return out
+    sizes = np.diff(offsets)
+    seq = np.repeat(np.arange(n), sizes)
+    step = np.zeros(len(coords))
+    step[1:] = np.linalg.norm(np.diff(coords, axis=0), axis=1)
+    step[offsets[:-1][sizes > 0]] = 0.0
+    walked = np.cumsum(step)
+    walked -= np.repeat(walked[offsets[:-1][sizes > 0]], sizes[sizes > 0])
+    total = np.zeros(n)
+    total[sizes > 0] = walked[offsets[1:][sizes > 0] - 1]
+    rank = np.arange(len(coords)) - np.repeat(offsets[:-1], sizes)
+    still = total[seq] <= 0
+    pos = np.where(still, rank / np.maximum(sizes[seq] - 1, 1), walked / np.where(still, 1.0, total[seq]))
+
+    # 시퀀스 번호 + 위치로 전역 정렬 키를 만들어 한 번의 searchsorted로 구간을 찾음
+    scale = 1.0 - 1e-9
+    key = seq + pos * scale
+    target = np.linspace(0.0, 1.0, points)
+    want = (np.arange(n)[:, None] + target[None, :] * scale).ravel()
+    left = np.searchsorted(key, want, side="right") - 1
+    first = np.repeat(offsets[:-1], points)
+    last = np.repeat(offsets[1:] - 1, points)
+    left = np.clip(left, first, np.maximum(last - 1, first))
+    left = np.minimum(left, len(coords) - 1)
+    right = np.maximum(np.minimum(left + 1, last), 0)
+    span = key[right] - key[left]
+    frac = np.where(span > 0, (want - key[left]) / np.where(span > 0, span, 1.0), 0.0).clip(0.0, 1.0)
+    values = coords[left] + (coords[right] - coords[left]) * frac[:, None]
+    out[sizes > 0] = values.reshape(n, points, dims)[sizes > 0]
+    return out
+
+
+class EmbedIndex:
+    """Brute-force Euclidean kNN over fixed-length trajectory embeddings.
+
+    Squared distances come from one matrix-vector product
+    (``|x|^2 - 2 x.q + |q|^2``), so a query over a full season is a single
+    BLAS call plus ``argpartition``.
+    """
+
+    def __init__(self, vectors: np.ndarray) -> None:
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float64)
+        self.norms = np.einsum("ij,ij->i", self.vectors, self.vectors)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def knn(self, query: np.ndarray, k: int, skip: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        # nearest rows and Euclidean distances, ``skip`` rows excluded
+        query = np.asarray(query, dtype=np.float64).ravel()
+        dist = self.norms - 2.0 * (self.vectors @ query) + float(query @ query)
+        if skip is not None:
+            dist[skip] = np.inf
+        k = min(int(k), int(np.isfinite(dist).sum()))
+        if k <= 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        top = np.argpartition(dist, k - 1)[:k]
+        top = top[np.argsort(dist[top], kind="stable")]
+        return top, np.sqrt(np.maximum(dist[top], 0.0))
@@ -0,0 +1,284 @@
+# DTW 거리 커널 - 정확 모드(기준 구현), 밴드/조기 중단을 지원하는 고속 모드, 다중 해상도 근사 모드
+from __future__ import annotations
+
+import os
+from typing import Optional
+
+import numpy as np
+
+try:
+    from numba import njit
+    _HAS_NUMBA = True
+except Exception:
+    njit = None
+    _HAS_NUMBA = False
+
+DTW_MODES = ("fast", "exact", "approx")
+# 근사 모드 기본 반경, 이보다 셀 수가 적은 쌍은 전체 DTW로 계산
+# (실제 Phase 길이 3~50점에서는 전체 DTW가 더 빠름 - scripts/bench_approx.py)
+APPROX_RADIUS = 1
+APPROX_MIN_CELLS = int(os.getenv("DTW_APPROX_MIN_CELLS", "4096"))
+
+
+def band_width(n: int, m: int, band: Optional[int]) -> int:
+    # Sakoe-Chiba window, widened so the end cell stays reachable
+    if band is None:
+        return max(n, m)
+    return max(int(band), abs(n - m))
+
+
+def dtw_exact(seq_a: np.ndarray, seq_b: np.ndarray) -> float:
+    n, m = len(seq_a), len(seq_b)
+    if n == 0 or m == 0:
+        return float("inf")
+    dp = np.full((n + 1, m + 1), np.inf)
+    dp[0, 0] = 0.0
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cost = np.linalg.norm(seq_a[i - 1] - seq_b[j - 1])
+            dp[i, j] = cost + min(dp[i - 1, j], dp[i, j - 1], dp[i - 1, j - 1])
+    return float(dp[n, m])
+
+
+def cost_mat(seq_a: np.ndarray, seq_b: np.ndarray) -> np.ndarray:
+    diff = seq_a[:, None, :] - seq_b[None, :, :]
+    return np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+
+
+def _dtw_diag(seq_a: np.ndarray, seq_b: np.ndarray, width: int, cutoff: float) -> float:
+    # Anti-diagonal sweep: cells with i + j == k only depend on diagonals k-1 and k-2
+    n, m = len(seq_a), len(seq_b)
+    flip = cost_mat(seq_a, seq_b)[:, ::-1]
+    prev2 = np.full(n + 1, np.inf)
+    prev1 = np.full(n + 1, np.inf)
+    prev2[0] = 0.0
+    for k in range(2, n + m + 1):
+        lo = max(1, k - m, (k - width + 1) // 2)
+        hi = min(n, k - 1, (k + width) // 2)
+        curr = np.full(n + 1, np.inf)
+        if lo <= hi:
+            cost = np.diagonal(flip, offset=m + 1 - k)
+            first = max(0, k - m - 1)
+            step = np.minimum(np.minimum(prev1[lo - 1:hi], prev1[lo:hi + 1]), prev2[lo - 1:hi])
+            curr[lo:hi + 1] = cost[lo - 1 - first:hi - first] + step
+            # every warping path crosses diagonal k or k-1
+            if min(curr[lo:hi + 1].min(), prev1.min()) > cutoff:
+                return float("inf")
+        prev2, prev1 = prev1, curr
+    return float(prev1[n])
+
+
+if _HAS_NUMBA:
+    @njit(cache=True, nogil=True)
+    def _dtw_jit(seq_a, seq_b, width, cutoff):
+        n, m = seq_a.shape[0], seq_b.shape[0]
+        dims = seq_a.shape[1]
+        prev = np.full(m + 1, np.inf)
+        curr = np.full(m + 1, np.inf)
+        prev[0] = 0.0
+        for i in range(1, n + 1):
+            curr[:] = np.inf
+            lo = max(1, i - width)
+            hi = min(m, i + width)
+            row_min = np.inf
+            for j in range(lo, hi + 1):
+                acc = 0.0
+                for d in range(dims):
+                    diff = seq_a[i - 1, d] - seq_b[j - 1, d]
+                    acc += diff * diff
+                best = prev[j - 1]
+                if prev[j] < best:
+                    best = prev[j]
+                if curr[j - 1] < best:
+                    best = curr[j - 1]
+                curr[j] = np.sqrt(acc) + best
+                if curr[j] < row_min:
+                    row_min = curr[j]
+            # every warping path crosses row i
+            if row_min > cutoff:
+                return np.inf
+            prev, curr = curr, prev
+        return prev[m]
+else:
+    _dtw_jit = None
+
+
+def dtw_fast(
+    seq_a: np.ndarray,
+    seq_b: np.ndarray,
+    band: Optional[int] = None,
+    cutoff: float = np.inf,
+) -> float:
+    """DTW distance with optional Sakoe-Chiba ``band`` and early abandoning.
+
+    Returns ``inf`` whenever the distance exceeds ``cutoff``, abandoning the
+    sweep as soon as every partial path does. Without a band or cutoff the
+    result equals ``dtw_exact`` up to float rounding.
+    """
+    n, m = len(seq_a), len(seq_b)
+    if n == 0 or m == 0:
+        return float("inf")
+    seq_a = np.ascontiguousarray(seq_a, dtype=np.float64)
+    seq_b = np.ascontiguousarray(seq_b, dtype=np.float64)
+    width = band_width(n, m, band)
+    if _HAS_NUMBA:
+        dist = float(_dtw_jit(seq_a, seq_b, width, float(cutoff)))
+    else:
+        dist = _dtw_diag(seq_a, seq_b, width, float(cutoff))
+    return dist if dist <= cutoff else float("inf")
+
+
+def _pyramid(seq):
+    # seq followed by its successive pair-averaged halvings, with level offsets
+    sizes = [seq.shape[0]]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    for k in range(len(sizes)):
+        offsets[k + 1] = offsets[k] + sizes[k]
+    out = np.empty((offsets[-1], seq.shape[1]))
+    out[:sizes[0]] = seq
+    for k in range(1, len(sizes)):
+        prev, base = offsets[k - 1], offsets[k]
+        for i in range(sizes[k]):
+            lo = prev + 2 * i
+            hi = min(lo + 1, prev + sizes[k - 1] - 1)
+            for d in range(seq.shape[1]):
+                out[base + i, d] = 0.5 * (out[lo, d] + out[hi, d])
+    return out, offsets
+
+
+def _approx_core(seq_a, seq_b, radius):
+    # FastDTW: exact DTW at the coarsest level, then windowed DTW level by level
+    pyr_a, off_a = _pyramid(seq_a)
+    pyr_b, off_b = _pyramid(seq_b)
+    dims = seq_a.shape[1]
+    top = 0
+    while top + 1 < len(off_a) - 1 and top + 1 < len(off_b) - 1 \
+            and min(off_a[top + 2] - off_a[top + 1], off_b[top + 2] - off_b[top + 1]) >= radius + 2:
+        top += 1
+    path_r = np.zeros(0, dtype=np.int64)
+    path_c = np.zeros(0, dtype=np.int64)
+    dist = np.inf
+    for level in range(top, -1, -1):
+        a = pyr_a[off_a[level]:off_a[level + 1]]
+        b = pyr_b[off_b[level]:off_b[level + 1]]
+        n, m = a.shape[0], b.shape[0]
+        lo = np.full(n, m - 1, dtype=np.int64)
+        hi = np.zeros(n, dtype=np.int64)
+        if level == top:
+            lo[:] = 0
+            hi[:] = m - 1
+        else:
+            for k in range(path_r.shape[0]):
+                for dr in range(2):
+                    r = min(2 * path_r[k] + dr, n - 1)
+                    lo[r] = min(lo[r], min(2 * path_c[k], m - 1))
+                    hi[r] = max(hi[r], min(2 * path_c[k] + 1, m - 1))
+            if radius > 0:
+                base_lo = lo.copy()
+                base_hi = hi.copy()
+                for i in range(n):
+                    for k in range(max(0, i - radius), min(n, i + radius + 1)):
+                        lo[i] = min(lo[i], base_lo[k])
+                        hi[i] = max(hi[i], base_hi[k])
+                    lo[i] = max(lo[i] - radius, 0)
+                    hi[i] = min(hi[i] + radius, m - 1)
+        # ragged rows: cell (i, j) lives at start[i] + j - lo[i]
+        start = np.zeros(n + 1, dtype=np.int64)
+        for i in range(n):
+            start[i + 1] = start[i] + hi[i] - lo[i] + 1
+        acc = np.empty(start[n])
+        for i in range(n):
+            for j in range(lo[i], hi[i] + 1):
+                total = 0.0
+                for d in range(dims):
+                    diff = a[i, d] - b[j, d]
+                    total += diff * diff
+                best = np.inf
+                if i == 0 and j == 0:
+                    best = 0.0
+                if j > lo[i] and acc[start[i] + j - 1 - lo[i]] < best:
+                    best = acc[start[i] + j - 1 - lo[i]]
+                if i > 0:
+                    if lo[i - 1] <= j <= hi[i - 1] and acc[start[i - 1] + j - lo[i - 1]] < best:
+                        best = acc[start[i - 1] + j - lo[i - 1]]
+                    if lo[i - 1] <= j - 1 <= hi[i - 1] and acc[start[i - 1] + j - 1 - lo[i - 1]] < best:
+                        best = acc[start[i - 1] + j - 1 - lo[i - 1]]
+                acc[start[i] + j - lo[i]] = np.sqrt(total) + best
+        if level == 0:
+            dist = acc[start[n - 1] + m - 1 - lo[n - 1]]
+            break
+        # backtrack the cheapest predecessor from the end cell
+        path_r = np.zeros(n + m, dtype=np.int64)
+        path_c = np.zeros(n + m, dtype=np.int64)
+        i, j, k = n - 1, m - 1, 0
+        while True:
+            path_r[k] = i
+            path_c[k] = j
+            k += 1
+            if i == 0 and j == 0:
+                break
+            diag = acc[start[i - 1] + j - 1 - lo[i - 1]] if i > 0 and lo[i - 1] <= j - 1 <= hi[i - 1] else np.inf
+            up = acc[start[i - 1] + j - lo[i - 1]] if i > 0 and lo[i - 1] <= j <= hi[i - 1] else np.inf
+            left = acc[start[i] + j - 1 - lo[i]] if j > lo[i] else np.inf
+            if diag <= up and diag <= left:
+                i, j = i - 1, j - 1
+            elif up <= left:
+                i -= 1
+            else:
+                j -= 1
+        path_r = path_r[:k]
+        path_c = path_c[:k]
+    return dist
+
+
+if _HAS_NUMBA:
+    _pyramid = njit(cache=True, nogil=True)(_pyramid)
+    _approx_core = njit(cache=True, nogil=True)(_approx_core)
+
+
+def dtw_approx(
+    seq_a: np.ndarray,
+    seq_b: np.ndarray,
+    radius: Optional[int] = None,
+    cutoff: float = np.inf,
+    min_cells: Optional[int] = None,
+) -> float:
+    """FastDTW-style multi-resolution DTW.
+
+    Both sequences are halved (pair averages) until one is ``radius + 2``
+    points long, the coarsest pair is aligned exactly, and each finer level
+    only fills the cells around the projected path widened by ``radius``.
+    The result never goes below the exact distance; larger radii are slower
+    and closer to it. Pairs under ``min_cells`` cells (default
+    ``APPROX_MIN_CELLS``) use full DTW; it only pays off for long sequences,
+    not for typical phases.
+    """
+    n, m = len(seq_a), len(seq_b)
+    if n == 0 or m == 0:
+        return float("inf")
+    radius = APPROX_RADIUS if radius is None else max(int(radius), 0)
+    if n * m < (APPROX_MIN_CELLS if min_cells is None else int(min_cells)):
+        return dtw_fast(seq_a, seq_b, None, cutoff)
+    seq_a = np.ascontiguousarray(seq_a, dtype=np.float64)
+    seq_b = np.ascontiguousarray(seq_b, dtype=np.float64)
+    dist = float(_approx_core(seq_a, seq_b, radius))
+    return dist if dist <= cutoff else float("inf")
+
+
+def dtw_dist(
+    seq_a: np.ndarray,
+    seq_b: np.ndarray,
+    mode: str = "fast",
+    band: Optional[int] = None,
+    cutoff: float = np.inf,
+) -> float:
+    if mode == "exact":
+        return dtw_exact(seq_a, seq_b)
+    if mode == "fast":
+        return dtw_fast(seq_a, seq_b, band, cutoff)
+    if mode == "approx":
+        # ``band`` is the refinement radius here
+        return dtw_approx(seq_a, seq_b, band, cutoff)
+    raise ValueError(f"dtw mode must be one of {DTW_MODES}")
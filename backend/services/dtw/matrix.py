@@ -0,0 +1,216 @@
+# DTW 거리 행렬 - 공유 메모리에 궤적을 적재하고 프로세스 풀에서 타일 단위로 계산
+from __future__ import annotations
+
+import os
+import time
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.pool import POOL_WORKERS, process_pool
+from .bound import lb_block, stat_add
+from .kernel import dtw_dist
+
+# 워커 수 (core.pool 공유 풀 기본값), 풀을 쓰기 시작하는 최소 쌍 수, 타일 크기
+# 최소 쌍 수: 워밍업된 풀의 분배 비용은 타일당 약 0.12ms라 2워커 기준 약 8000쌍(Phase 128개)부터 이득
+DTW_WORKERS = POOL_WORKERS
+MIN_POOL_PAIRS = int(os.getenv("DTW_POOL_MIN_PAIRS", "8000"))
+TILE = 32
+
+# 워커 프로세스별 공유 메모리 연결 캐시
+_views: Dict[str, Tuple[SharedMemory, np.ndarray, np.ndarray]] = {}
+
+
+def seq_pack(seqs: Sequence[np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    offsets = np.zeros(len(seqs) + 1, dtype=np.int64)
+    if len(seqs):
+        offsets[1:] = np.cumsum([len(s) for s in seqs])
+    dims = seqs[0].shape[1] if len(seqs) and np.ndim(seqs[0]) == 2 else 2
+    coords = np.concatenate(seqs).astype(np.float64, copy=False) if offsets[-1] else np.zeros((0, dims))
+    return coords.reshape(-1, dims), offsets
+
+
+def tile_dist(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    rows: Tuple[int, int],
+    cols: Tuple[int, int],
+    mode: str = "fast",
+    band: Optional[int] = None,
+    cutoff: Optional[float] = None,
+) -> Tuple[np.ndarray, int, int]:
+    """Upper-triangle cells of one (rows x cols) tile; the rest stay zero.
+
+    With a ``cutoff``, pairs whose lower bound already exceeds it skip DTW and
+    keep the bound, and abandoned pairs get a value just above the cutoff.
+    Returns the block plus pruned and abandoned pair counts.
+    """
+    block = np.zeros((rows[1] - rows[0], cols[1] - cols[0]))
+    bounds = lb_block(coords, offsets, rows, cols) if cutoff is not None else None
+    limit = np.inf if cutoff is None else float(cutoff)
+    above = np.nextafter(limit, np.inf)
+    pruned = abandoned = 0
+    for i in range(rows[0], rows[1]):
+        seq_a = coords[offsets[i]:offsets[i + 1]]
+        for j in range(max(cols[0], i + 1), cols[1]):
+            r, c = i - rows[0], j - cols[0]
+            if bounds is not None and bounds[r, c] > limit:
+                block[r, c] = bounds[r, c]
+                pruned += 1
+                continue
+            seq_b = coords[offsets[j]:offsets[j + 1]]
+            dist = dtw_dist(seq_a, seq_b, mode, band, limit)
+            if dist > limit:
+                dist = max(above, bounds[r, c])
+                abandoned += 1
+            block[r, c] = dist
+    return block, pruned, abandoned
+
+
+def _attach(name: str, n_seqs: int, n_rows: int, dims: int) -> Tuple[np.ndarray, np.ndarray]:
+    if name not in _views:
+        while _views:
+            old_name = next(iter(_views))
+            shm = _views.pop(old_name)[0]
+            shm.close()
+        shm = SharedMemory(name=name)
+        offsets = np.ndarray((n_seqs + 1,), dtype=np.int64, buffer=shm.buf)
+        coords = np.ndarray((n_rows, dims), dtype=np.float64, buffer=shm.buf, offset=offsets.nbytes)
+        _views[name] = (shm, coords, offsets)
+    _, coords, offsets = _views[name]
+    return coords, offsets
+
+
+def _tile_task(
+    name: str,
+    shape: Tuple[int, int, int],
+    rows: Tuple[int, int],
+    cols: Tuple[int, int],
+    mode: str,
+    band: Optional[int],
+    cutoff: Optional[float],
+) -> Tuple[Tuple[int, int], Tuple[int, int], Tuple[np.ndarray, int, int]]:
+    coords, offsets = _attach(name, *shape)
+    return rows, cols, tile_dist(coords, offsets, rows, cols, mode, band, cutoff)
+
+
+def _warm_task() -> int:
+    # import this module and compile the DTW / bound kernels in a worker
+    coords = np.zeros((6, 2))
+    offsets = np.array([0, 3, 6], dtype=np.int64)
+    tile_dist(coords, offsets, (0, 2), (0, 2), cutoff=1.0)
+    tile_dist(coords, offsets, (0, 2), (0, 2))
+    return os.getpid()
+
+
+def pool_warm(workers: Optional[int] = None) -> Dict:
+    """Start the shared pool's workers and compile their kernels ahead of the first matrix.
+
+    A cold spawn pool pays process start, imports and JIT on its first call
+    (seconds instead of milliseconds for a landmark matrix).
+    """
+    workers = DTW_WORKERS if workers is None else int(workers)
+    if workers <= 1:
+        return {"workers": 0, "seconds": 0.0}
+    t0 = time.perf_counter()
+    pool = process_pool(workers)
+    pids = {task.result() for task in [pool.submit(_warm_task) for _ in range(workers)]}
+    return {"workers": len(pids), "seconds": round(time.perf_counter() - t0, 2)}
+
+
+def tile_grid(n: int, tile: int = TILE) -> List[Tuple[Tuple[int, int], Tuple[int, int]]]:
+    edges = list(range(0, n, tile)) + [n]
+    spans = list(zip(edges[:-1], edges[1:]))
+    return [(rows, cols) for a, rows in enumerate(spans) for cols in spans[a:]]
+
+
+def pair_mat(
+    seqs: Sequence[np.ndarray],
+    mode: str = "fast",
+    band: Optional[int] = None,
+    workers: Optional[int] = None,
+    cutoff: Optional[float] = None,
+    stats: Optional[Dict] = None,
+) -> np.ndarray:
+    """Symmetric pairwise DTW matrix.
+
+    Trajectories are packed into one shared-memory buffer (offsets + coords)
+    and the upper triangle is split into ``TILE``-sized tiles for a process
+    pool. Inputs under ``MIN_POOL_PAIRS`` pairs, or ``workers <= 1``, run
+    in-process. With a ``cutoff`` only distances up to it are exact (see
+    ``tile_dist``); prune counts are added to ``stats``.
+    """
+    n = len(seqs)
+    workers = DTW_WORKERS if workers is None else int(workers)
+    coords, offsets = seq_pack(seqs)
+    upper = np.zeros((n, n))
+    pruned = abandoned = 0
+    if workers <= 1 or n * (n - 1) // 2 < MIN_POOL_PAIRS:
+        for rows, cols in tile_grid(n):
+            block, tile_pruned, tile_abandoned = tile_dist(coords, offsets, rows, cols, mode, band, cutoff)
+            upper[rows[0]:rows[1], cols[0]:cols[1]] = block
+            pruned += tile_pruned
+            abandoned += tile_abandoned
+    else:
+        shm = SharedMemory(create=True, size=max(offsets.nbytes + coords.nbytes, 1))
+        try:
+            np.ndarray(offsets.shape, dtype=np.int64, buffer=shm.buf)[:] = offsets
+            np.ndarray(coords.shape, dtype=np.float64, buffer=shm.buf, offset=offsets.nbytes)[:] = coords
+            shape = (n, coords.shape[0], coords.shape[1])
+            pool = process_pool(workers)
+            tasks = [
+                pool.submit(_tile_task, shm.name, shape, rows, cols, mode, band, cutoff)
+                for rows, cols in tile_grid(n)
+            ]
+            for task in tasks:
+                rows, cols, (block, tile_pruned, tile_abandoned) = task.result()
+                upper[rows[0]:rows[1], cols[0]:cols[1]] = block
+                pruned += tile_pruned
+                abandoned += tile_abandoned
+        finally:
+            shm.close()
+            shm.unlink()
+    if stats is not None:
+        stat_add(stats, pairs=n * (n - 1) // 2, pruned=pruned, abandoned=abandoned)
+    return upper + upper.T
+
+
+def proto_near(
+    seqs: Sequence[np.ndarray],
+    protos: Sequence[np.ndarray],
+    mode: str = "fast",
+    band: Optional[int] = None,
+    stats: Optional[Dict] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Nearest prototype index and DTW distance for every sequence.
+
+    Bounds against all prototypes are computed per ``TILE`` of sequences, and
+    prototypes are visited in bound order with the best distance so far as
+    the pruning and early-abandon cutoff.
+    """
+    n, k = len(seqs), len(protos)
+    nearest = np.full(n, -1, dtype=np.int64)
+    best = np.full(n, np.inf)
+    if n == 0 or k == 0:
+        return nearest, best
+    coords, offsets = seq_pack(list(seqs) + list(protos))
+    pruned = 0
+    for start in range(0, n, TILE):
+        rows = (start, min(n, start + TILE))
+        bounds = lb_block(coords, offsets, rows, (n, n + k))
+        for r, i in enumerate(range(rows[0], rows[1])):
+            seq = coords[offsets[i]:offsets[i + 1]]
+            order = np.argsort(bounds[r], kind="stable")
+            for visited, c in enumerate(order):
+                if bounds[r, c] > best[i]:
+                    pruned += k - visited
+                    break
+                proto = coords[offsets[n + c]:offsets[n + c + 1]]
+                dist = dtw_dist(seq, proto, mode, band, best[i])
+                if dist < best[i] or nearest[i] < 0:
+                    best[i] = dist
+                    nearest[i] = c
+    if stats is not None:
+        stat_add(stats, pairs=n * k, pruned=pruned)
+    return nearest, best
@@ -0,0 +1,123 @@
+# 궤적 단순화 - DTW 전처리 (Douglas-Peucker / 호 길이 재표본화) 와 Phase별 캐시
+from __future__ import annotations
+
+import os
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .embed import resample
+from .store import seq_key
+
+SIMPLIFY_MODES = ("dp", "resample")
+# 기본 단순화 방식 (빈 문자열이면 사용 안 함), 최대 점 수, Douglas-Peucker 허용 오차(m)
+SIMPLIFY_MODE = os.getenv("DTW_SIMPLIFY", "")
+SIMPLIFY_POINTS = int(os.getenv("DTW_SIMPLIFY_POINTS", "20"))
+SIMPLIFY_TOL = float(os.getenv("DTW_SIMPLIFY_TOL", "1.0"))
+CACHE_SIZE = 50000
+
+_cache: "OrderedDict[Tuple, np.ndarray]" = OrderedDict()
+_cache_lock = Lock()
+
+
+def seg_dist(points: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # distance from each point to the segment a-b
+    ab = b - a
+    span = float(ab @ ab)
+    t = np.zeros(len(points)) if span == 0 else np.clip((points - a) @ ab / span, 0.0, 1.0)
+    gap = points - (a + t[:, None] * ab)
+    return np.sqrt(np.einsum("ij,ij->i", gap, gap))
+
+
+def douglas_peucker(seq: np.ndarray, tol: float = SIMPLIFY_TOL, max_points: Optional[int] = None) -> np.ndarray:
+    """Douglas-Peucker keeping at most ``max_points`` points.
+
+    Segments are split worst-first, so stopping at ``max_points`` keeps the
+    points that matter most; splitting also stops once every point lies
+    within ``tol`` of the simplified path.
+    """
+    n = len(seq)
+    limit = n if max_points is None else max(int(max_points), 2)
+    if n <= 2 or limit >= n and tol <= 0:
+        return seq
+    keep = [0, n - 1]
+    # (worst error, split point, left end, right end) per open segment
+    spans: List[Tuple[float, int, int, int]] = []
+
+    def push(lo: int, hi: int) -> None:
+        if hi - lo < 2:
+            return
+        dist = seg_dist(seq[lo + 1:hi], seq[lo], seq[hi])
+        pos = int(np.argmax(dist))
+        spans.append((float(dist[pos]), lo + 1 + pos, lo, hi))
+
+    push(0, n - 1)
+    while spans and len(keep) < limit:
+        worst = max(range(len(spans)), key=lambda i: spans[i][0])
+        err, mid, lo, hi = spans.pop(worst)
+        if err <= tol:
+            break
+        keep.append(mid)
+        push(lo, mid)
+        push(mid, hi)
+    return seq[np.sort(keep)]
+
+
+def arc_resample(seq: np.ndarray, max_points: int = SIMPLIFY_POINTS) -> np.ndarray:
+    # evenly spaced arc-length points, only for sequences longer than max_points
+    if len(seq) <= max_points:
+        return seq
+    return resample(seq, np.array([0, len(seq)]), max(int(max_points), 2))[0]
+
+
+def simplify(
+    seq: np.ndarray,
+    mode: str = "dp",
+    max_points: int = SIMPLIFY_POINTS,
+    tol: float = SIMPLIFY_TOL,
+) -> np.ndarray:
+    """Simplified copy of one trajectory, cached by its fingerprint."""
+    if mode not in SIMPLIFY_MODES:
+        raise ValueError(f"simplify mode must be one of {SIMPLIFY_MODES}")
+    seq = np.ascontiguousarray(seq, dtype=np.float64)
+    if len(seq) <= 2 or (mode == "resample" and len(seq) <= max_points):
+        return seq
+    key = (seq_key(seq), mode, int(max_points), float(tol))
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+    out = douglas_peucker(seq, tol, max_points) if mode == "dp" else arc_resample(seq, max_points)
+    with _cache_lock:
+        _cache[key] = out
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return out
+
+
+def pair_cells(lengths: np.ndarray) -> int:
+    # DTW cells over all unordered pairs: sum_{i<j} n_i * n_j
+    lengths = np.asarray(lengths, dtype=np.float64)
+    return int((lengths.sum() ** 2 - (lengths ** 2).sum()) // 2)
+
+
+def simplify_list(
+    seqs: Sequence[np.ndarray],
+    mode: str = "dp",
+    max_points: int = SIMPLIFY_POINTS,
+    tol: float = SIMPLIFY_TOL,
+    stats: Optional[Dict] = None,
+) -> List[np.ndarray]:
+    """``simplify`` over many trajectories, adding point and DTW cell counts to ``stats``."""
+    out = [simplify(seq, mode, max_points, tol) for seq in seqs]
+    if stats is not None:
+        before = np.array([len(s) for s in seqs])
+        after = np.array([len(s) for s in out])
+        cells = (pair_cells(before), pair_cells(after))
+        stats["points_before"] = int(before.sum())
+        stats["points_after"] = int(after.sum())
+        stats["cells_before"], stats["cells_after"] = cells
+        stats["cell_ratio"] = cells[1] / max(cells[0], 1)
+    return out
@@ -0,0 +1,255 @@
+# DTW 거리 캐시 - Phase 좌표 지문(해시) 기반 영구 저장소 (희소 상삼각 형식)
+from __future__ import annotations
+
+import atexit
+import hashlib
+import os
+from pathlib import Path
+from threading import Lock, Timer
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .kernel import dtw_dist
+from .matrix import pair_mat
+
+# 캐시 디렉터리 (빈 문자열이면 비활성화)
+CACHE_DIR = os.getenv("DTW_CACHE_DIR", str(Path(__file__).resolve().parents[2] / ".cache" / "dtw"))
+# 저장소당 최대 거리 쌍 수 - 넘으면 가장 오래 쓰이지 않은 Phase의 쌍부터 버림
+MAX_PAIRS = int(os.getenv("DTW_CACHE_MAX_PAIRS", "4000000"))
+# 새 거리를 디스크에 모아 쓰는 간격(초), 0이면 추가할 때마다 저장
+FLUSH_SECONDS = float(os.getenv("DTW_CACHE_FLUSH", "30"))
+
+
+def seq_key(seq: np.ndarray) -> int:
+    seq = np.ascontiguousarray(seq, dtype=np.float64)
+    digest = hashlib.blake2b(seq.tobytes(), digest_size=8, person=str(seq.shape).encode()[:16])
+    return int.from_bytes(digest.digest(), "little")
+
+
+class DistStore:
+    """Pairwise DTW distances keyed by phase fingerprints.
+
+    ``keys`` holds one uint64 fingerprint per known phase, and distances are
+    kept as upper-triangle COO triples (``rows < cols`` index into ``keys``),
+    saved to one ``.npz`` per DTW configuration. ``ticks`` records when each
+    phase was last used; past ``max_pairs`` pairs the least recently used ones
+    are dropped. New pairs are written out by a background flush.
+    """
+
+    def __init__(self, path: Optional[Path], max_pairs: int = MAX_PAIRS) -> None:
+        self._lock = Lock()
+        self._save_lock = Lock()
+        self._timer: Optional[Timer] = None
+        self.path = path
+        self.max_pairs = max_pairs
+        self.dirty = False
+        self.clock = 0
+        self.keys = np.zeros(0, dtype=np.uint64)
+        self.ticks = np.zeros(0, dtype=np.int64)
+        self.rows = np.zeros(0, dtype=np.int32)
+        self.cols = np.zeros(0, dtype=np.int32)
+        self.vals = np.zeros(0, dtype=np.float64)
+        if path is not None and path.exists():
+            try:
+                with np.load(path) as saved:
+                    self.keys, self.rows, self.cols, self.vals = (
+                        saved["keys"], saved["rows"], saved["cols"], saved["vals"]
+                    )
+                    self.ticks = saved["ticks"] if "ticks" in saved else np.zeros(len(self.keys), dtype=np.int64)
+            except Exception:
+                pass
+            self._load_check()
+
+    def __len__(self) -> int:
+        return len(self.vals)
+
+    def _load_check(self) -> None:
+        # 손상되었거나 예전 형식인 파일은 비우고, 정상이면 압축해서 사용
+        n = len(self.keys)
+        if len(self.ticks) != n or len(np.unique(self.keys)) != n or not (len(self.rows) == len(self.cols) == len(self.vals)):
+            self.keys = np.zeros(0, dtype=np.uint64)
+            self.ticks = np.zeros(0, dtype=np.int64)
+            self.rows = np.zeros(0, dtype=np.int32)
+            self.cols = np.zeros(0, dtype=np.int32)
+            self.vals = np.zeros(0, dtype=np.float64)
+            return
+        self.clock = int(self.ticks.max()) + 1 if n else 0
+        size = len(self.vals)
+        self._compact(self.max_pairs)
+        if len(self.vals) != size:
+            self._schedule()
+
+    def _compact(self, limit: int) -> None:
+        """Drop invalid and duplicate pairs, keep the ``limit`` most recently
+        used ones, and renumber the phases that are still referenced."""
+        n = len(self.keys)
+        rows, cols = self.rows.astype(np.int64), self.cols.astype(np.int64)
+        ok = (rows >= 0) & (rows < cols) & (cols < n) & np.isfinite(self.vals)
+        keep = np.flatnonzero(ok)
+        # 같은 쌍이 여러 번 있으면 마지막 값만 남김
+        code = (rows[keep] << 32) | cols[keep]
+        _, last = np.unique(code[::-1], return_index=True)
+        keep = np.sort(keep[len(keep) - 1 - last])
+        if len(keep) > limit:
+            age = np.minimum(self.ticks[rows[keep]], self.ticks[cols[keep]])
+            keep = np.sort(keep[np.argsort(age, kind="stable")[len(keep) - limit:]])
+        used = np.zeros(n, dtype=bool)
+        used[rows[keep]] = True
+        used[cols[keep]] = True
+        remap = np.cumsum(used) - 1
+        self.keys = self.keys[used]
+        self.ticks = self.ticks[used]
+        self.rows = remap[rows[keep]].astype(np.int32)
+        self.cols = remap[cols[keep]].astype(np.int32)
+        self.vals = self.vals[keep]
+
+    def _ids(self, keys: np.ndarray) -> np.ndarray:
+        # store id per requested key, -1 if unknown
+        ids = np.full(len(keys), -1, dtype=np.int64)
+        if len(self.keys):
+            order = np.argsort(self.keys)
+            pos = np.searchsorted(self.keys, keys, sorter=order).clip(max=len(self.keys) - 1)
+            hit = self.keys[order[pos]] == keys
+            ids[hit] = order[pos[hit]]
+        return ids
+
+    def _touch(self, ids: np.ndarray) -> None:
+        self.ticks[ids[ids >= 0]] = self.clock
+        self.clock += 1
+
+    def fill(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # cached distances for the requested phases plus a known-pair mask
+        n = len(keys)
+        dist = np.zeros((n, n))
+        known = np.eye(n, dtype=bool)
+        with self._lock:
+            ids = self._ids(keys)
+            if not len(self.vals) or (ids < 0).all():
+                return dist, known
+            self._touch(ids)
+            where = np.full(len(self.keys), -1, dtype=np.int64)
+            where[ids[ids >= 0]] = np.flatnonzero(ids >= 0)
+            r, c = where[self.rows], where[self.cols]
+            hit = (r >= 0) & (c >= 0)
+            r, c, v = r[hit], c[hit], self.vals[hit]
+        dist[r, c] = v
+        dist[c, r] = v
+        known[r, c] = True
+        known[c, r] = True
+        # duplicate phases inside one request share a fingerprint
+        same = keys[:, None] == keys[None, :]
+        known |= same
+        return dist, known
+
+    def add(self, keys: np.ndarray, dist: np.ndarray, fresh: np.ndarray) -> None:
+        r, c = np.nonzero(np.triu(fresh, 1))
+        # 같은 지문끼리의 쌍은 저장하지 않음
+        r, c = r[keys[r] != keys[c]], c[keys[r] != keys[c]]
+        if not len(r):
+            return
+        with self._lock:
+            ids = self._ids(keys)
+            unknown = np.unique(keys[ids < 0])
+            self.keys = np.concatenate([self.keys, unknown])
+            self.ticks = np.concatenate([self.ticks, np.zeros(len(unknown), dtype=np.int64)])
+            ids = self._ids(keys)
+            self._touch(ids)
+            a, b = np.minimum(ids[r], ids[c]), np.maximum(ids[r], ids[c])
+            # 요청 안의 중복 Phase 쌍과 이미 저장된 쌍은 건너뜀
+            code = (a << 32) | b
+            code, first = np.unique(code, return_index=True)
+            new = ~np.isin(code, (self.rows.astype(np.int64) << 32) | self.cols)
+            first = first[new]
+            if not len(first):
+                return
+            self.rows = np.concatenate([self.rows, a[first].astype(np.int32)])
+            self.cols = np.concatenate([self.cols, b[first].astype(np.int32)])
+            self.vals = np.concatenate([self.vals, dist[r[first], c[first]]])
+            if len(self.vals) > self.max_pairs:
+                # 여유를 두고 줄여서 매번 압축하지 않도록 함
+                self._compact(self.max_pairs * 4 // 5)
+            self._schedule()
+        if FLUSH_SECONDS <= 0:
+            self.flush()
+
+    def _schedule(self) -> None:
+        # lock held: mark dirty and start one delayed flush
+        self.dirty = True
+        if self.path is None or FLUSH_SECONDS <= 0 or self._timer is not None:
+            return
+        self._timer = Timer(FLUSH_SECONDS, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def flush(self) -> None:
+        """Write pending pairs to disk; the file is rewritten outside the lock."""
+        with self._lock:
+            timer, self._timer = self._timer, None
+            if not self.dirty or self.path is None:
+                return
+            self.dirty = False
+            # arrays are only ever replaced, never modified in place except ticks
+            saved = dict(keys=self.keys, ticks=self.ticks.copy(), rows=self.rows, cols=self.cols, vals=self.vals)
+        if timer is not None:
+            timer.cancel()
+        with self._save_lock:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.path.with_name(self.path.stem + f".{os.getpid()}.tmp.npz")
+                np.savez(tmp, **saved)
+                os.replace(tmp, self.path)
+            except OSError:
+                pass
+
+
+_stores: Dict[Tuple[str, Optional[int]], DistStore] = {}
+_stores_lock = Lock()
+
+
+def dist_store(mode: str = "fast", band: Optional[int] = None) -> DistStore:
+    key = (mode, band)
+    with _stores_lock:
+        if key not in _stores:
+            path = Path(CACHE_DIR) / f"{mode}_{'full' if band is None else band}.npz" if CACHE_DIR else None
+            _stores[key] = DistStore(path)
+        return _stores[key]
+
+
+@atexit.register
+def flush_stores() -> None:
+    # 종료 시 아직 쓰지 않은 거리 저장
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.flush()
+
+
+def cached_mat(
+    seqs: Sequence[np.ndarray],
+    mode: str = "fast",
+    band: Optional[int] = None,
+    workers: Optional[int] = None,
+    stats: Optional[Dict] = None,
+) -> np.ndarray:
+    """``pair_mat`` that reuses stored distances and only computes missing pairs.
+
+    When most pairs are missing the whole matrix goes through ``pair_mat`` (and
+    its process pool); otherwise the missing pairs are computed in-process.
+    """
+    n = len(seqs)
+    keys = np.array([seq_key(seq) for seq in seqs], dtype=np.uint64)
+    store = dist_store(mode, band)
+    dist, known = store.fill(keys)
+    missing = ~known
+    n_missing = int(np.triu(missing, 1).sum())
+    if n_missing * 2 > n * (n - 1) // 2:
+        dist = pair_mat(seqs, mode, band, workers)
+    else:
+        for i, j in zip(*np.nonzero(np.triu(missing, 1))):
+            dist[i, j] = dist[j, i] = dtw_dist(seqs[i], seqs[j], mode, band)
+    if stats is not None:
+        stats["cache_hits"] = stats.get("cache_hits", 0) + n * (n - 1) // 2 - n_missing
+        stats["cache_misses"] = stats.get("cache_misses", 0) + n_missing
+    store.add(keys, dist, missing)
+    return dist
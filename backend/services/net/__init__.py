@@ -0,0 +1 @@
+# net 패키지 - 희소 행렬 기반 패스 네트워크 중심성 계산
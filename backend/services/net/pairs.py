@@ -0,0 +1,75 @@
+# 패스 → 수신자 쌍 테이블 - 리그 전체를 데이터 세대(data_stamp)마다 한 번만 매칭
+from __future__ import annotations
+
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from ..core.data import data_stamp, raw, recent_games
+
+# 패스 이후 수신 이벤트까지 허용하는 최대 action_id 간격
+PAIR_GAP = 30
+PASS_COLS = [
+    "game_id", "action_id", "team_id", "player_id", "player_name_ko", "position_name", "main_position",
+    "start_x", "start_y", "end_x", "end_y",
+]
+KEY_COLS = ["game_id", "team_id", "action_id", "player_id"]
+
+
+def pass_pairs(events: pd.DataFrame) -> pd.DataFrame:
+    """Every pass with its receiver, in event order.
+
+    The receiver is the next Pass Received of the same game and team within
+    ``PAIR_GAP`` actions; ``player_id_recv`` / ``action_id_recv`` are -1 when
+    there is none or when it is the passer.
+    """
+    cols = [col for col in PASS_COLS if col in events.columns]
+    passes = events[events["type_name"] == "Pass"][cols].copy()
+    received = events[events["type_name"] == "Pass Received"][["game_id", "team_id", "action_id", "player_id"]].copy()
+    for frame in (passes, received):
+        frame["action_id"] = pd.to_numeric(frame["action_id"], errors="coerce")
+    passes = passes.dropna(subset=KEY_COLS)
+    received = received.dropna(subset=KEY_COLS)
+    for frame in (passes, received):
+        for col in ("game_id", "team_id", "action_id"):
+            frame[col] = frame[col].astype(np.int64)
+    passes = passes.reset_index(drop=True)
+    passes["player_id_recv"] = np.int64(-1)
+    passes["action_id_recv"] = np.int64(-1)
+    if passes.empty or received.empty:
+        return passes
+
+    received = received.rename(columns={"player_id": "player_id_recv", "action_id": "action_id_recv"})
+    received["player_id_recv"] = received["player_id_recv"].astype(np.int64)
+    left = passes[["game_id", "team_id", "action_id", "player_id"]].assign(row=np.arange(len(passes)))
+    pairs = pd.merge_asof(
+        left.sort_values("action_id", kind="stable"),
+        received.sort_values("action_id_recv", kind="stable"),
+        left_on="action_id",
+        right_on="action_id_recv",
+        by=["game_id", "team_id"],
+        direction="forward",
+        tolerance=PAIR_GAP,
+    )
+    pairs = pairs.dropna(subset=["player_id_recv"])
+    pairs = pairs[pairs["player_id"].to_numpy(dtype=np.float64) != pairs["player_id_recv"].to_numpy(dtype=np.float64)]
+    rows = pairs["row"].to_numpy()
+    passes.loc[rows, "player_id_recv"] = pairs["player_id_recv"].to_numpy(dtype=np.int64)
+    passes.loc[rows, "action_id_recv"] = pairs["action_id_recv"].to_numpy(dtype=np.int64)
+    return passes
+
+
+@lru_cache(maxsize=2)
+def _pair_table(mark: tuple) -> pd.DataFrame:
+    return pass_pairs(raw())
+
+
+def pair_table() -> pd.DataFrame:
+    return _pair_table(data_stamp())
+
+
+def team_pairs(team_id: int, n_games: int = 5) -> pd.DataFrame:
+    # 팀의 최근 n_games 경기 패스 쌍 (리그 테이블 슬라이스)
+    table = pair_table()
+    return table[table["game_id"].isin(recent_games(team_id, n_games)) & (table["team_id"] == int(team_id))]
@@ -0,0 +1,45 @@
+# 리그 패턴 프로토타입 phase_id가 기본 Phase 저장소의 리플레이로 그대로 이어지는지 확인
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from routers import patterns
+from services.analyzers.league import LeagueAnalyzer
+from services.core import data
+from services.core.phase import phase_store
+
+pytestmark = pytest.mark.skipif(
+    not (data.DATA_DIR / "raw_data.csv").exists(), reason="open_track 데이터가 없습니다"
+)
+
+
+def test_prototype_replay():
+    analyzer = LeagueAnalyzer(n_games=5, n_protos=5, workers=1)
+    league = analyzer.data()
+    rows = analyzer.team_rows()
+    protos = analyzer.proto_list(np.sort(np.concatenate(list(rows.values()))))
+    home = phase_store()
+    app = FastAPI()
+    app.include_router(patterns.router, prefix="/api/patterns")
+    client = TestClient(app)
+
+    assert [p["phase_id"] for p in league["prototypes"]] == analyzer.home_ids(protos)
+    assert any(proto["phase_id"] is not None for proto in league["prototypes"])
+    for proto, pos in zip(league["prototypes"], protos):
+        if proto["phase_id"] is None:
+            continue
+        res = client.get(f"/api/patterns/{proto['team_id']}/phases/{proto['phase_id']}/replay")
+        assert res.status_code == 200
+        # the replayed phase holds most of the prototype's actions
+        index = analyzer.store.index
+        mine = set(index.events["action_id"].iloc[index.starts[pos]:index.stops[pos]])
+        theirs = set(home.frame(proto["phase_id"])["action_id"])
+        assert len(mine & theirs) * 2 >= len(mine)
+        assert len(res.json()["events"]) == len(theirs)
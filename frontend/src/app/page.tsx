@@ -268,7 +268,7 @@ export default function Home() {
     setReplayLoading(true);
     setIsPlaying(false);
     try {
-      const data = await getPhaseReplay(teamId, phaseId, ANALYSIS_GAMES);
+      const data = await getPhaseReplay(teamId, phaseId);
       if (analysisToken.current !== token) return;
       setReplayEvents(data.events);
       setSelectedPhase(phaseId);
@@ -188,11 +188,11 @@ export async function getTeamVAEP(teamId: number, nGames: number = 100, nTop: nu
 }
 
 // 공격 페이즈 리플레이 데이터 조회
-export async function getPhaseReplay(teamId: number, phaseId: number, nGames: number = 5) {
+export async function getPhaseReplay(teamId: number, phaseId: number) {
     return fetchAPI<{
         phase_id: number;
         events: import('@/types').ReplayEvent[];
-    }>(`/api/patterns/${teamId}/phases/${phaseId}/replay?n_games=${nGames}`);
+    }>(`/api/patterns/${teamId}/phases/${phaseId}/replay`);
 }
 
 // 팀 세트피스 루틴 조회
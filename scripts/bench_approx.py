@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# 근사 DTW 벤치마크 - 반경별 지연 시간과 정확 DTW 대비 군집 일치도(ARI), 실제 Phase 포함
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from bench_cluster import walk_index
+from bench_dtw import phase_walks
+from services.analyzers.pattern import PatternMiner
+from services.dtw import kernel
+from services.dtw.kernel import dtw_approx
+
+
+def run(index, mode: str, band, n_clusters: int) -> tuple:
+    miner = PatternMiner(index, cache=False, workers=1, cluster_mode="exact", dtw_mode=mode, band=band)
+    t0 = time.perf_counter()
+    dist = miner.dist_mat()
+    elapsed = time.perf_counter() - t0
+    return elapsed, dist, miner.tree_cut(dist, n_clusters)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phases", type=int, default=300)
+    parser.add_argument("--radii", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--clusters", type=int, nargs="+", default=[10, 50])
+    # 0이면 짧은 쌍도 근사 경로로 계산 (기본값은 kernel.APPROX_MIN_CELLS)
+    parser.add_argument("--min-cells", type=int, default=0)
+    parser.add_argument("--no-real", action="store_true", help="실제 Phase(리그 Phase 저장소) 측정 생략")
+    args = parser.parse_args()
+    kernel.APPROX_MIN_CELLS = args.min_cells
+    dtw_approx(np.zeros((80, 2)), np.zeros((80, 2)))  # JIT warm-up
+
+    inputs = [(f"{lo}-{hi}", walk_index(phase_walks(args.phases, seed=hi, lo=lo, hi=hi))) for lo, hi in ((3, 40), (40, 120), (120, 360))]
+    if not args.no_real:
+        from services.core.phase import phase_store
+
+        index = phase_store().index
+        keep = np.random.default_rng(0).choice(len(index), size=min(args.phases, len(index)), replace=False)
+        inputs.insert(0, ("real", index.take(np.sort(keep))))
+    run(inputs[0][1].take(np.arange(4)), "fast", None, 1)  # JIT warm-up
+
+    print(f"{'lengths':>8} {'mode':>9} {'seconds':>8} {'dist ratio':>10} " + " ".join(f"{'ARI@' + str(k):>7}" for k in args.clusters))
+    for label, index in inputs:
+        ref_time, ref_dist, _ = run(index, "fast", None, 1)
+        ref_labels = [run(index, "fast", None, k)[2] for k in args.clusters]
+        upper = np.triu_indices(len(index), 1)
+        print(f"{label:>8} {'fast':>9} {ref_time:>8.2f} {1.0:>10.4f} " + " ".join(f"{1.0:>7.3f}" for _ in args.clusters))
+        for radius in args.radii:
+            elapsed, dist, _ = run(index, "approx", radius, 1)
+            ratio = float(np.mean(dist[upper] / np.maximum(ref_dist[upper], 1e-9)))
+            scores = []
+            for k, ref in zip(args.clusters, ref_labels):
+                miner = PatternMiner(index, cache=False, workers=1)
+                scores.append(adjusted_rand_score(ref, miner.tree_cut(dist, k)))
+            name = f"approx r{radius}"
+            print(f"{'':>8} {name:>9} {elapsed:>8.2f} {ratio:>10.4f} " + " ".join(f"{s:>7.3f}" for s in scores))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+# 패턴 클러스터링 확장성 벤치마크 - Phase 수에 따른 지연 시간과 메모리 증가 (exact vs landmark)
+import argparse
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from bench_dtw import phase_walks
+from services.analyzers.pattern import PatternMiner
+from services.core.phase import PhaseIndex, phase_rows
+
+
+def walk_index(walks: list) -> PhaseIndex:
+    coords = np.concatenate(walks)
+    stops = np.cumsum([len(w) for w in walks])
+    starts = stops - np.array([len(w) for w in walks])
+    events = pd.DataFrame({"start_x": coords[:, 0], "start_y": coords[:, 1]})
+    return PhaseIndex(events, phase_rows(len(events), starts, stops), starts, stops)
+
+
+def run(index: PhaseIndex, mode: str, landmarks: int) -> tuple:
+    miner = PatternMiner(index, cache=False, workers=1, cluster_mode=mode, landmarks=landmarks)
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    miner.label_list(100)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 2**20, miner.dtw_stats.get("prune_rate", 0.0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[200, 500, 1000, 2000, 4000])
+    parser.add_argument("--exact-max", type=int, default=2000)
+    parser.add_argument("--landmarks", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'phases':>7} {'mode':>9} {'seconds':>9} {'peak MiB':>9} {'pruned':>7}")
+    for size in args.sizes:
+        index = walk_index(phase_walks(size, seed=size))
+        for mode in ("exact", "landmark"):
+            if mode == "exact" and size > args.exact_max:
+                continue
+            elapsed, peak, pruned = run(index, mode, args.landmarks)
+            print(f"{size:>7} {mode:>9} {elapsed:>9.2f} {peak:>9.1f} {pruned:>7.1%}")
+
+
+if __name__ == "__main__":
+    main()
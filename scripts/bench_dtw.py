@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# DTW 커널 마이크로 벤치마크 - 기존 정확 모드 대비 고속 커널 비교
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from services.dtw import kernel
+from services.dtw.kernel import dtw_exact, dtw_fast, band_width
+from services.dtw.matrix import DTW_WORKERS, pair_mat
+
+
+def phase_walks(n: int, seed: int = 0, lo: int = 3, hi: int = 40) -> list:
+    # Random-walk trajectories with phase-like lengths on a 105x68 pitch
+    rng = np.random.default_rng(seed)
+    walks = []
+    for _ in range(n):
+        size = int(rng.integers(lo, hi))
+        start = rng.uniform([0, 0], [105, 68])
+        steps = rng.normal([4.0, 0.0], [8.0, 6.0], size=(size, 2))
+        walks.append(np.clip(start + np.cumsum(steps, axis=0), [0, 0], [105, 68]))
+    return walks
+
+
+def timed(fn, pairs, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for a, b in pairs:
+            fn(a, b)
+        best = min(best, time.perf_counter() - t0)
+    return best / len(pairs) * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pairs", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--band", type=int, default=5)
+    parser.add_argument("--phases", type=int, default=600)
+    parser.add_argument("--workers", type=int, default=DTW_WORKERS)
+    args = parser.parse_args()
+
+    walks = phase_walks(2 * args.pairs)
+    pairs = list(zip(walks[::2], walks[1::2]))
+    exact = np.array([dtw_exact(a, b) for a, b in pairs])
+    fast = np.array([dtw_fast(a, b) for a, b in pairs])
+    cutoff = float(np.median(exact))
+
+    print(f"DTW micro-benchmark ({len(pairs)} pairs, lengths 3-39, numba={kernel._HAS_NUMBA})")
+    print(f"- parity max |fast - exact|: {np.abs(fast - exact).max():.2e}")
+    rows = [
+        ("exact (reference)", lambda a, b: dtw_exact(a, b)),
+        ("fast", lambda a, b: dtw_fast(a, b)),
+        (f"fast band={args.band}", lambda a, b: dtw_fast(a, b, band=args.band)),
+        ("fast cutoff=median", lambda a, b: dtw_fast(a, b, cutoff=cutoff)),
+        ("anti-diagonal numpy", lambda a, b: kernel._dtw_diag(a, b, band_width(len(a), len(b), None), np.inf)),
+    ]
+    base = None
+    for name, fn in rows:
+        us = timed(fn, pairs, args.repeat)
+        base = base or us
+        print(f"- {name:<22} {us:10.1f} us/pair  x{base / us:7.1f}")
+
+    banded = np.array([dtw_fast(a, b, band=args.band) for a, b in pairs])
+    print(f"- band={args.band} mean relative inflation: {np.mean(banded / np.maximum(exact, 1e-9) - 1):.3%}")
+    abandoned = np.mean([np.isinf(dtw_fast(a, b, cutoff=cutoff)) for a, b in pairs])
+    print(f"- pairs abandoned at median cutoff: {abandoned:.1%}")
+
+    walks = phase_walks(args.phases, seed=1)
+    print(f"\nDistance matrix ({args.phases} phases, {args.phases * (args.phases - 1) // 2} pairs)")
+    pair_mat(walks[:8], workers=1)
+    for workers in sorted({1, args.workers}):
+        t0 = time.perf_counter()
+        pair_mat(walks, workers=workers)
+        print(f"- workers={workers:<3} {time.perf_counter() - t0:8.3f} s")
+    full = pair_mat(walks, workers=1)
+    cutoff = float(np.quantile(full[np.triu_indices(len(walks), 1)], 0.05))
+    stats = {}
+    t0 = time.perf_counter()
+    pair_mat(walks, workers=1, cutoff=cutoff, stats=stats)
+    print(
+        f"- lower-bound pruning at 5% quantile cutoff: {time.perf_counter() - t0:8.3f} s, "
+        f"prune rate {stats['prune_rate']:.1%}, abandoned {stats['abandoned']}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# 패스 네트워크 중심성 벤치마크 - networkx 경로 대비 희소 행렬 엔진 비교
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import networkx as nx
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from services.analyzers.network import NetworkAnalyzer
+from services.net.graph import adj_mat, between_cent, degree_cent, page_rank
+
+
+def random_edges(n: int, seed: int = 0, density: float = 0.4):
+    # Pass-count graph: n players, each directed pair linked with probability density
+    rng = np.random.default_rng(seed)
+    mask = (rng.random((n, n)) < density) & ~np.eye(n, dtype=bool)
+    src, dst = np.nonzero(mask)
+    return src, dst, rng.integers(1, 30, len(src)).astype(float)
+
+
+def nx_stats(src, dst, weight, n):
+    graph = nx.DiGraph()
+    graph.add_nodes_from(range(n))
+    graph.add_weighted_edges_from(zip(src.tolist(), dst.tolist(), weight.tolist()))
+    return nx.degree_centrality(graph), nx.betweenness_centrality(graph, weight="weight"), nx.pagerank(graph, weight="weight")
+
+
+def sparse_stats(src, dst, weight, n):
+    adj = adj_mat(src, dst, weight, n)
+    return degree_cent(adj), between_cent(adj), page_rank(adj)
+
+
+def best(fn, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[14, 20, 30, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--teams", type=int, default=5, help="real teams to time (0 to skip)")
+    parser.add_argument("--games", type=int, default=5)
+    args = parser.parse_args()
+
+    print("Centralities on random pass graphs (degree + betweenness + pagerank)")
+    print(f"{'players':>7} {'edges':>6} {'networkx ms':>12} {'sparse ms':>10} {'speedup':>8} {'max diff':>9}")
+    for n in args.sizes:
+        src, dst, weight = random_edges(n)
+        ref = nx_stats(src, dst, weight, n)
+        out = sparse_stats(src, dst, weight, n)
+        diff = max(np.abs(np.array([r[i] for i in range(n)]) - o).max() for r, o in zip(ref, out))
+        t_nx = best(lambda: nx_stats(src, dst, weight, n), args.repeat)
+        t_sp = best(lambda: sparse_stats(src, dst, weight, n), args.repeat)
+        print(f"{n:>7} {len(src):>6} {t_nx * 1e3:>12.2f} {t_sp * 1e3:>10.2f} {t_nx / t_sp:>7.1f}x {diff:>9.1e}")
+
+    if args.teams <= 0:
+        return
+    try:
+        from services.core.data import team_events, teams
+        team_ids = [int(team["team_id"]) for team in teams()][:args.teams]
+    except Exception as e:
+        print(f"real data skipped: {e}")
+        return
+    print(f"\nNetworkAnalyzer.cent() on real teams (last {args.games} games, graph build included)")
+    print(f"{'team':>6} {'players':>7} {'networkx ms':>12} {'sparse ms':>10} {'speedup':>8}")
+    for team_id in team_ids:
+        events = team_events(team_id, args.games)
+        if len(events) == 0:
+            continue
+        players = len(NetworkAnalyzer(events).cent())
+        t_nx = best(lambda: NetworkAnalyzer(events, engine="networkx").cent(), args.repeat)
+        t_sp = best(lambda: NetworkAnalyzer(events, engine="sparse").cent(), args.repeat)
+        print(f"{team_id:>6} {players:>7} {t_nx * 1e3:>12.2f} {t_sp * 1e3:>10.2f} {t_nx / t_sp:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# 패턴 파이프라인 단계별 벤치마크 - 분할/특징/군집/시퀀스 마이닝과 team_pat 전체의 시간과 메모리 할당을 JSON으로 기록
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+# 반복 실행이 영구 DTW 거리 캐시를 읽지 않도록 비활성화 (import 전에 설정)
+os.environ.setdefault("DTW_CACHE_DIR", "")
+
+from services.analyzers.pattern import PatternMiner, PhaseAnalyzer, team_pat
+from services.core.spadl import action_rows
+from services.dtw.kernel import dtw_fast
+
+TYPES = ["Pass", "Pass Received", "Carry", "Shot", "Cross", "Tackle", "Interception", "Clearance", "Duel", "Recovery"]
+WEIGHTS = np.array([30, 25, 12, 2, 2, 3, 3, 3, 5, 3], dtype=float)
+
+
+def synth_events(n_games: int, team_id: int = 1, seed: int = 0, per_half: int = 800) -> pd.DataFrame:
+    # Deterministic event stream: team_id against rotating opponents, possession switches ~8%
+    rng = np.random.default_rng(seed)
+    frames = []
+    for g in range(n_games):
+        opponent = 2 + g % 11
+        for period in (1, 2):
+            n = per_half
+            times = np.cumsum(rng.exponential(3.0, n)).round(1)
+            switch = np.cumsum(rng.random(n) < 0.08) % 2
+            sx, sy = rng.uniform(0, 105, n), rng.uniform(0, 68, n)
+            ex = np.clip(sx + rng.normal(5, 10, n), 0, 105)
+            ey = np.clip(sy + rng.normal(0, 8, n), 0, 68)
+            frames.append(pd.DataFrame({
+                "game_id": 1000 + g, "period_id": period, "time_seconds": times,
+                "action_id": np.arange(n) + (period - 1) * n,
+                "team_id": np.where(switch == 0, team_id, opponent),
+                "player_id": rng.integers(0, 14, n),
+                "type_name": rng.choice(TYPES, n, p=WEIGHTS / WEIGHTS.sum()),
+                "result_name": rng.choice(["Successful", "Unsuccessful"], n),
+                "start_x": sx, "start_y": sy, "end_x": ex, "end_y": ey, "dx": ex - sx, "dy": ey - sy,
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def real_events(team_id: int, n_games: int) -> pd.DataFrame:
+    from services.core.data import match_events
+    return match_events(team_id, n_games, include_opponent=True, normalize_mode="team")
+
+
+class Stages:
+    def __init__(self, alloc: bool) -> None:
+        self.alloc = alloc
+        self.result = {}
+
+    def run(self, name: str, fn):
+        if self.alloc:
+            tracemalloc.start()
+        t0 = time.perf_counter()
+        out = fn()
+        elapsed = time.perf_counter() - t0
+        row = {"seconds": round(elapsed, 6)}
+        if self.alloc:
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            row["alloc_kib"] = round(current / 1024, 1)
+            row["peak_kib"] = round(peak / 1024, 1)
+        self.result[name] = row
+        return out
+
+
+def pipeline(events: pd.DataFrame, team_id: int, mode: str, alloc: bool, n_patterns: int = 3) -> dict:
+    # stages through PatternMiner's own entry points (no 200-phase cap), then team_pat end to end
+    stages = Stages(alloc)
+    index = stages.run("segmentation", lambda: PhaseAnalyzer(action_rows(events)).phase_index())
+    team_phases = stages.run("team_filter", lambda: index.take(index.lead("team_id") == int(team_id)))
+    miner = PatternMiner(team_phases, n_patterns, cache=False, cluster_mode=mode)
+    stages.run("features", miner.feat_mat)
+    stages.run("trajectories", miner.seq_list)
+    n_clusters = min(100, len(team_phases))
+    labels = stages.run("clustering", lambda: miner.label_list(n_clusters))
+    clusters = stages.run("aggregate", lambda: miner.cluster_map(n_clusters, labels))
+    stages.run("tokens", miner.token_list)
+    stages.run("sequence_mining", lambda: miner.pattern_top(n_patterns, clusters))
+    total = sum(row["seconds"] for row in stages.result.values())
+    stages.run("team_pat", lambda: team_pat(events, team_id, n_patterns, cluster_mode=mode))
+    return {
+        "phases": len(team_phases), "events": len(events), "total_seconds": round(total, 6),
+        "dtw_stats": miner.dtw_stats, "stages": stages.result,
+    }
+
+
+def meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "commit": commit, "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(), "numpy": np.__version__, "pandas": pd.__version__,
+    }
+
+
+def compare(old: dict, new: dict) -> None:
+    before = {(r["input"], r["n_games"], r["mode"]): r for r in old.get("runs", [])}
+    print(f"{'input':>9} {'games':>5} {'mode':>8} {'stage':>15} {'old s':>8} {'new s':>8} {'ratio':>6}")
+    for run in new["runs"]:
+        prev = before.get((run["input"], run["n_games"], run["mode"]))
+        if prev is None:
+            continue
+        for stage, row in run["stages"].items():
+            was = prev["stages"].get(stage, {}).get("seconds")
+            if was is None:
+                continue
+            ratio = row["seconds"] / was if was > 0 else float("inf")
+            print(f"{run['input']:>9} {run['n_games']:>5} {run['mode']:>8} {stage:>15} {was:>8.3f} {row['seconds']:>8.3f} {ratio:>6.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, nargs="+", default=[1, 3, 5, 10])
+    parser.add_argument("--inputs", nargs="+", default=["synthetic", "real"], choices=["synthetic", "real"])
+    parser.add_argument("--modes", nargs="+", default=["landmark"], choices=["landmark", "exact"])
+    parser.add_argument("--team", type=int, default=1, help="team_id for real data")
+    parser.add_argument("--repeat", type=int, default=1, help="keep the fastest of N runs")
+    parser.add_argument("--no-alloc", action="store_true", help="skip tracemalloc (faster, timing only)")
+    parser.add_argument("--out", type=Path, default=ROOT / "backend" / ".cache" / "bench" / "bench_patterns.json")
+    parser.add_argument("--compare", type=Path, default=None, help="earlier JSON output to diff against")
+    args = parser.parse_args()
+
+    dtw_fast(np.zeros((4, 2)), np.ones((5, 2)))  # JIT warm-up outside the timings
+    report = {"meta": meta(), "runs": []}
+    print(f"{'input':>9} {'games':>5} {'mode':>8} {'phases':>6} {'seconds':>8}  slowest stages")
+    for source in args.inputs:
+        for n_games in args.games:
+            try:
+                events = synth_events(n_games) if source == "synthetic" else real_events(args.team, n_games)
+            except Exception as e:
+                print(f"{source:>9} {n_games:>5} skipped: {e}")
+                continue
+            if len(events) == 0:
+                continue
+            team_id = 1 if source == "synthetic" else args.team
+            for mode in args.modes:
+                runs = [pipeline(events, team_id, mode, not args.no_alloc) for _ in range(max(args.repeat, 1))]
+                best = min(runs, key=lambda r: r["total_seconds"])
+                report["runs"].append({"input": source, "n_games": n_games, "mode": mode, **best})
+                slow = sorted(best["stages"].items(), key=lambda kv: -kv[1]["seconds"])[:3]
+                print(f"{source:>9} {n_games:>5} {mode:>8} {best['phases']:>6} {best['total_seconds']:>8.2f}  "
+                      + ", ".join(f"{name} {row['seconds']:.2f}s" for name, row in slow))
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"saved {args.out}")
+    if args.compare is not None:
+        compare(json.loads(args.compare.read_text(encoding="utf-8")), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# 순차 패턴 마이닝 벤치마크 - 기존 조합 열거 방식 대비 PrefixSpan (긴 Phase)
+import argparse
+import sys
+import time
+from collections import Counter
+from itertools import combinations
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from services.analyzers.pattern import seq_mine
+
+TOKENS = [
+    "pass FROM 중앙_중앙 TO 공격_중앙", "pass FROM 수비_좌측 TO 중앙_좌측", "dribble FROM 중앙_우측 TO 공격_우측",
+    "cross FROM 공격_좌측 TO 박스_중앙", "shot AT 박스_중앙", "take_on AT 공격_중앙", "pass FROM 공격_우측 TO 박스_중앙",
+    "interception AT 중앙_중앙", "dribble FROM 수비_중앙 TO 중앙_중앙", "pass FROM 중앙_좌측 TO 공격_좌측",
+]
+
+
+def legacy_support(sequences: list, min_support: int, max_len: int = 4) -> dict:
+    # Previous approach: enumerate every ordered index combination per phase
+    counter: Counter = Counter()
+    for seq in sequences:
+        seen = set()
+        for length in range(2, min(max_len, len(seq)) + 1):
+            for idxs in combinations(range(len(seq)), length):
+                seen.add(tuple(seq[i] for i in idxs))
+        counter.update(seen)
+    return {pat: sup for pat, sup in counter.items() if sup >= min_support}
+
+
+def phases(n: int, length: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    weights = np.linspace(3, 1, len(TOKENS))
+    weights /= weights.sum()
+    return [[TOKENS[i] for i in rng.choice(len(TOKENS), size=length, p=weights)] for _ in range(n)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phases", type=int, default=40)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 20, 40, 80])
+    parser.add_argument("--legacy-max", type=int, default=40)
+    parser.add_argument("--max-gap", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'length':>6} {'legacy s':>9} {'prefixspan s':>13} {'gap<=%d s' % args.max_gap:>10} {'patterns':>9} {'match':>6}")
+    for length in args.lengths:
+        seqs = phases(args.phases, length, seed=length)
+        min_support = max(2, int(len(seqs) * 0.1))
+        t0 = time.perf_counter()
+        mined = dict(seq_mine(seqs, min_support))
+        t_new = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        seq_mine(seqs, min_support, max_gap=args.max_gap)
+        t_gap = time.perf_counter() - t0
+        if length <= args.legacy_max:
+            t0 = time.perf_counter()
+            legacy = legacy_support(seqs, min_support)
+            t_old = f"{time.perf_counter() - t0:9.3f}"
+            match = "yes" if legacy == mined else "NO"
+        else:
+            t_old, match = f"{'-':>9}", "-"
+        print(f"{length:>6} {t_old} {t_new:>13.3f} {t_gap:>10.3f} {len(mined):>9} {match:>6}")
+
+
+if __name__ == "__main__":
+    main()
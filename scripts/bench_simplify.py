@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+# 궤적 단순화 벤치마크 - 방식/최대 점 수별 DTW 작업량 감소, 행렬 시간, 원본 대비 군집 일치도(ARI)
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from sklearn.metrics import adjusted_rand_score
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from bench_cluster import walk_index
+from bench_dtw import phase_walks
+from services.analyzers.pattern import PatternMiner
+
+
+def run(index, simplify, max_points: int, n_clusters: int) -> tuple:
+    miner = PatternMiner(index, cache=False, workers=1, cluster_mode="exact", simplify=simplify, max_points=max_points)
+    t0 = time.perf_counter()
+    seqs = miner.seq_list()
+    dist = miner.dist_mat(seqs)
+    elapsed = time.perf_counter() - t0
+    return elapsed, miner.dtw_stats.get("cell_ratio", 1.0), miner.tree_cut(dist, n_clusters)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--phases", type=int, default=300)
+    parser.add_argument("--points", type=int, nargs="+", default=[8, 12, 20])
+    parser.add_argument("--clusters", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'lengths':>8} {'mode':>13} {'seconds':>8} {'cells':>7} {'ARI':>6}")
+    for lo, hi in ((3, 40), (40, 120)):
+        index = walk_index(phase_walks(args.phases, seed=hi, lo=lo, hi=hi))
+        ref_time, _, ref = run(index, None, 0, args.clusters)
+        print(f"{lo:>3}-{hi:<4} {'none':>13} {ref_time:>8.2f} {1.0:>7.1%} {1.0:>6.3f}")
+        for mode in ("dp", "resample"):
+            for points in args.points:
+                elapsed, ratio, labels = run(index, mode, points, args.clusters)
+                name = f"{mode} K={points}"
+                print(f"{'':>8} {name:>13} {elapsed:>8.2f} {ratio:>7.1%} {adjusted_rand_score(ref, labels):>6.3f}")
+
+
+if __name__ == "__main__":
+    main()
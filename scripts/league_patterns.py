@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+# 리그 패턴 비교 배치 작업 - 전 팀 × 공유 프로토타입 행렬을 계산해 캐시 디렉터리(또는 --out)에 저장
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "backend"))
+
+from services.analyzers.league import LEAGUE_PROTOS, league_box, league_path
+from services.core.data import data_stamp
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n-games", type=int, default=5)
+    parser.add_argument("--n-protos", type=int, default=LEAGUE_PROTOS)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    mark = data_stamp()
+    t0 = time.perf_counter()
+    result = league_box(args.n_games, args.n_protos, mark, args.workers)
+    elapsed = time.perf_counter() - t0
+    if args.out is not None:
+        args.out.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"teams={len(result.get('teams', []))} prototypes={len(result.get('prototypes', []))} "
+          f"seconds={elapsed:.1f} saved={args.out or league_path(args.n_games, args.n_protos, mark)}")
+
+
+if __name__ == "__main__":
+    main()